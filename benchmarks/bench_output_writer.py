@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Write-time benchmark of the output workbook backends (Step 11).
+
+Builds a synthetic Master/Priority/Pending data set and writes it once per backend,
+each in a fresh process so peak memory readings do not mix.
+
+Usage (from the repository root):
+    python benchmarks/bench_output_writer.py --rows 100000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from case_assigner.memstats import current_rss_mb, peak_rss_mb
+from case_assigner.writer import WRITER_BACKENDS, frame_value_rows, open_output_writer, resolve_writer_backend
+
+
+def build_frames(rows, seed=7):
+    """Returns (master, priority, pending, dashboard_sections) shaped like a real run."""
+    rng = np.random.default_rng(seed)
+    reviewers = np.array(["Anthoni", "Janakiram", "Narasimha", "Prabhakar", "Rajalakshmi", "Sudhakar"])
+    classes = np.array(["Literature", "Non-AE Case", None, "Spontaneous"], dtype=object)
+    master = pd.DataFrame({
+        'AER#': (np.arange(rows) + 1000000).astype(str),
+        'Report Classification': rng.choice(classes, rows),
+        'Assigned To': rng.choice(np.array([None, "Bob", "x@bms.com"], dtype=object), rows),
+        'Company Unit': rng.choice(np.array(["BMS US", "BMS EU", "Other"]), rows),
+        'No of days due to Case Due Date': rng.integers(-5, 30, rows),
+        'Case Due Date': pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 60, rows), unit='D'),
+    })
+    for extra in range(20): master[f'Extra {extra}'] = rng.random(rows)
+    subset = master.iloc[: rows // 2].copy()
+    subset['Individual Assignment'] = rng.choice(reviewers, len(subset))
+    subset['Remarks'] = None
+    priority, pending = subset.iloc[: len(subset) // 2], subset.iloc[len(subset) // 2:]
+    pivot = priority.groupby('Individual Assignment').size().to_frame('Number of Cases')
+    sections = [(f"Summary: Cases Assigned This Run ({len(priority)})", [("By Reviewer:", pivot)])]
+    return master, priority, pending, sections
+
+
+def run_single(backend, rows):
+    """Writes one workbook with `backend` and returns the measurements as a dict."""
+    master, priority, pending, sections = build_frames(rows)
+    rss_before = current_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bench.xlsx")
+        start = time.perf_counter()
+        with open_output_writer(path, backend) as writer:
+            writer.write_rows("Master data", frame_value_rows(master))
+            writer.write_frame("Priority Cases", priority)
+            writer.write_frame("Pending Cases", pending)
+            writer.write_dashboard("Dashboard", sections)
+        elapsed = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+    peak = peak_rss_mb()
+    return {
+        'backend': backend, 'rows': rows, 'seconds': round(elapsed, 3), 'file_mb': round(size_mb, 2),
+        'peak_rss_mb': None if peak is None else round(peak, 1),
+        'peak_over_start_mb': None if peak is None or rss_before is None else round(peak - rss_before, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the output workbook writers.")
+    parser.add_argument('--rows', type=int, default=50000, help="Master data rows (default: %(default)s).")
+    parser.add_argument('--backends', default=','.join(WRITER_BACKENDS), help="Comma-separated backends to compare.")
+    parser.add_argument('--single', default=None, help=argparse.SUPPRESS) # Internal: child process mode
+    args = parser.parse_args(argv)
+
+    if args.single:
+        print(json.dumps(run_single(args.single, args.rows)))
+        return 0
+
+    results = []
+    for backend in [b.strip() for b in args.backends.split(',') if b.strip()]:
+        if resolve_writer_backend(backend) != backend:
+            print(f"Skipping '{backend}' (not available)."); continue
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), '--single', backend, '--rows', str(args.rows)],
+                               capture_output=True, text=True)
+        if child.returncode != 0:
+            print(f"'{backend}' failed:\n{child.stderr}"); continue
+        results.append(json.loads(child.stdout.strip().splitlines()[-1]))
+
+    baseline = next((r for r in results if r['backend'] == 'pandas'), None)
+    print(f"{'backend':<12}{'rows':>10}{'seconds':>10}{'speedup':>10}{'peak MB':>10}{'+MB':>8}{'file MB':>9}")
+    for r in results:
+        speedup = f"{baseline['seconds'] / r['seconds']:.2f}x" if baseline and r['seconds'] else '-'
+        print(f"{r['backend']:<12}{r['rows']:>10}{r['seconds']:>10.2f}{speedup:>10}{str(r['peak_rss_mb']):>10}{str(r['peak_over_start_mb']):>8}{r['file_mb']:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
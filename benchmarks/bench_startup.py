@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Startup benchmark of the GUI.
+
+Each measurement runs in a fresh interpreter. `python -X importtime` reports the
+cumulative import time of every module; the benchmark prints the total for the GUI
+module (main) and for the assignment core, the slowest top-level imports of the GUI
+and fails if a data library (pandas, numpy, openpyxl, ...) is imported before the
+window is built. With a display available it also measures the time from
+interpreter start to the first drawn window.
+
+Usage (from the repository root):
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 5 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUI_MODULE = 'main'
+CORE_MODULE = 'case_assigner.core'
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'xlsxwriter', 'pyarrow', 'python_calamine')
+
+
+def import_times(module):
+    """Imports `module` in a fresh interpreter; returns [(module_name, cumulative_us, depth), ...] in import order."""
+    child = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                           capture_output=True, text=True, cwd=REPO_ROOT)
+    if child.returncode != 0: raise RuntimeError(f"Importing {module} failed:\n{child.stderr}")
+    times = []
+    for line in child.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line: continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times.append((name.strip(), int(cumulative), (len(name) - len(name.lstrip())) // 2))
+    return times
+
+
+def first_paint_seconds():
+    """Seconds from interpreter start to the first drawn window, or None without a display."""
+    code = ("import time; start = time.perf_counter()\n"
+            "import tkinter as tk\n"
+            "try: root = tk.Tk()\n"
+            "except tk.TclError: print('none'); raise SystemExit\n"
+            f"import {GUI_MODULE}; app = {GUI_MODULE}.CaseAssignerApp(root); root.update()\n"
+            "print(time.perf_counter() - start); root.destroy()")
+    start = time.perf_counter()
+    child = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=REPO_ROOT)
+    lines = child.stdout.strip().splitlines()
+    if child.returncode != 0 or not lines or lines[-1] == 'none': return None
+    return time.perf_counter() - start # Includes interpreter start-up, like a double-click would
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the GUI start-up (imports and first window).")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters per measurement; the median is reported (default: %(default)s).")
+    parser.add_argument('--top', type=int, default=10, help="Slowest imports of the GUI module to list (default: %(default)s).")
+    args = parser.parse_args(argv)
+
+    gui_runs = [import_times(GUI_MODULE) for _ in range(args.repeat)]
+    core_runs = [import_times(CORE_MODULE) for _ in range(args.repeat)]
+    total = lambda times, module: next(us for name, us, depth in times if name == module) / 1e6
+    print(f"import {GUI_MODULE}: {statistics.median(total(t, GUI_MODULE) for t in gui_runs):.3f}s "
+          f"(the assignment core alone: {statistics.median(total(t, CORE_MODULE) for t in core_runs):.3f}s)")
+
+    direct = sorted((entry for entry in gui_runs[-1] if entry[2] == 1), key=lambda entry: -entry[1])
+    print(f"\nSlowest imports of {GUI_MODULE}:")
+    for name, us, _ in direct[:args.top]: print(f"  {name:<40}{us / 1000:>9.1f} ms")
+
+    paint = [first_paint_seconds() for _ in range(args.repeat)]
+    if None in paint: print("\nFirst window: not measured (no display).")
+    else: print(f"\nFirst window drawn after {statistics.median(paint):.3f}s")
+
+    heavy = sorted({name for name, _, _ in gui_runs[-1] if name.split('.')[0] in HEAVY_MODULES and '.' not in name})
+    if heavy:
+        print(f"\nThe GUI imports {', '.join(heavy)} at start-up; import them where they are used (see worker.preload_core).")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
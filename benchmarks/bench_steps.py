@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Per-step benchmark of perform_assignment on synthetic Lifesphere exports.
+
+Each size runs in a fresh process (inside a scratch working directory, so the real
+reviewers.ini and history store are not touched) and records wall time and the
+process peak RSS at the end of every numbered step, grouped into phases:
+    load (1) | filters (2-5) | merge (6-8) | assignment (9-10) | pivots + write (11)
+Results can be saved as a baseline and later runs are compared against it.
+
+Usage (from the repository root):
+    python benchmarks/bench_steps.py --rows 10000,100000 --save-baseline
+    python benchmarks/bench_steps.py --rows 10000,100000              (compare with the saved baseline)
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_DIR = os.path.join(BENCH_DIR, 'data')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline_steps.json')
+PHASES = [('load', (1,)), ('filters', (2, 3, 4, 5)), ('merge', (6, 7, 8)), ('assignment', (9, 10)), ('write', (11,))]
+REVIEWERS = ["Anthoni", "Janakiram", "Narasimha", "Prabhakar", "Rajalakshmi", "Sudhakar"]
+
+
+def run_single(rows, data_dir):
+    """Runs one assignment on the generated workbooks for `rows` and returns the measurements as a dict."""
+    from benchmarks.generate_lifesphere import LS_SHEET, generate
+    from case_assigner import core
+    from case_assigner.memstats import peak_rss_mb
+
+    ls_path = os.path.join(data_dir, f"lifesphere_{rows}.xlsx")
+    prev_path = os.path.join(data_dir, f"previous_{rows}.xlsx")
+    if not (os.path.exists(ls_path) and os.path.exists(prev_path)): ls_path, prev_path = generate(rows, data_dir)
+
+    marks = [] # (step, start_time, peak_rss_before_step)
+    def progress(step, label): marks.append((step, time.perf_counter(), peak_rss_mb()))
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        shutil.copy(os.path.join(REPO_ROOT, core.FILTER_RULES_FILE), work_dir)
+        os.chdir(work_dir)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            success, message = core.perform_assignment(ls_path, prev_path, LS_SHEET, "Priority Cases", "Pending Cases", REVIEWERS, work_dir, progress=progress)
+        end = time.perf_counter()
+        end_peak = peak_rss_mb()
+        os.chdir(REPO_ROOT)
+    if not success: raise RuntimeError(message)
+
+    steps = {}
+    for i, (step, step_start, _) in enumerate(marks):
+        step_end, peak_after = (marks[i + 1][1], marks[i + 1][2]) if i + 1 < len(marks) else (end, end_peak)
+        steps[str(step)] = {'seconds': round(step_end - step_start, 4), 'peak_rss_mb': None if peak_after is None else round(peak_after, 1)}
+    phases = {}
+    for phase, phase_steps in PHASES:
+        measured = [steps[str(s)] for s in phase_steps if str(s) in steps]
+        if not measured: continue
+        peaks = [m['peak_rss_mb'] for m in measured if m['peak_rss_mb'] is not None]
+        phases[phase] = {'seconds': round(sum(m['seconds'] for m in measured), 4), 'peak_rss_mb': max(peaks) if peaks else None}
+    return {'rows': rows, 'total_seconds': round(end - start, 3), 'peak_rss_mb': None if end_peak is None else round(end_peak, 1),
+            'steps': steps, 'phases': phases}
+
+
+def compare(result, baseline, tolerance):
+    """Returns a list of regression messages for phases slower (or larger) than baseline * (1 + tolerance)."""
+    regressions = []
+    for phase, measured in result['phases'].items():
+        base = baseline.get('phases', {}).get(phase)
+        if not base: continue
+        for metric in ('seconds', 'peak_rss_mb'):
+            new, old = measured.get(metric), base.get(metric)
+            if new is None or not old: continue
+            if new > old * (1 + tolerance) and (metric != 'seconds' or new - old > 0.05): # Ignore sub-50ms noise
+                regressions.append(f"{result['rows']} rows, {phase} {metric}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_table(result, baseline):
+    print(f"\n{result['rows']:,} rows: {result['total_seconds']:.2f}s total, peak {result['peak_rss_mb']} MB")
+    print(f"  {'phase':<12}{'seconds':>10}{'baseline':>10}{'change':>9}{'peak MB':>10}")
+    for phase, measured in result['phases'].items():
+        base = (baseline or {}).get('phases', {}).get(phase, {})
+        old = base.get('seconds')
+        change = f"{(measured['seconds'] / old - 1) * 100:+.0f}%" if old else '-'
+        print(f"  {phase:<12}{measured['seconds']:>10.3f}{(f'{old:.3f}' if old else '-'):>10}{change:>9}{str(measured['peak_rss_mb']):>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark perform_assignment step by step.")
+    parser.add_argument('--rows', default='10000', help="Comma-separated export sizes (default: %(default)s).")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="Generated workbooks (created if missing).")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file (default: benchmarks/baseline_steps.json).")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline.")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown before a phase is reported (default: %(default)s).")
+    parser.add_argument('--single', type=int, default=None, help=argparse.SUPPRESS) # Internal: child process mode
+    args = parser.parse_args(argv)
+
+    if args.single:
+        print(json.dumps(run_single(args.single, args.data_dir)))
+        return 0
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f: baselines = json.load(f)
+
+    results, regressions = {}, []
+    for rows in [int(r) for r in args.rows.split(',') if r.strip()]:
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), '--single', str(rows), '--data-dir', args.data_dir],
+                               capture_output=True, text=True, cwd=REPO_ROOT)
+        if child.returncode != 0:
+            print(f"{rows} rows failed:\n{child.stderr}"); continue
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        results[str(rows)] = result
+        baseline = None if args.save_baseline else baselines.get(str(rows))
+        print_table(result, baseline)
+        if baseline: regressions += compare(result, baseline, args.tolerance)
+
+    if args.save_baseline and results:
+        baselines.update(results)
+        with open(args.baseline, 'w') as f: json.dump(baselines, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for message in regressions: print(f"  {message}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
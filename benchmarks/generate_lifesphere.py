@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic Lifesphere export + previous assignment workbook generator.
+
+The export mimics the real one: 5 title rows above the header, the COL_* columns,
+"N day(s)" due-day strings, mixed Company Units and e-mail/name/blank Assigned To values.
+The previous assignment workbook (Priority Cases / Pending Cases) reuses part of the
+export's AER#s, so the pending-case matching in Steps 7 & 8 has real work to do.
+
+Usage (from the repository root):
+    python benchmarks/generate_lifesphere.py --rows 100000 --output-dir benchmarks/data
+    python benchmarks/generate_lifesphere.py --preset all    (10k, 100k and 1M rows)
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from case_assigner.core import (LS_HEADER_ROWS, COL_AER, COL_REPORT_CLASS, COL_ASSIGNED_TO, COL_COMPANY_UNIT,
+                                COL_DUE_DAYS, COL_CASE_SERIOUSNESS, COL_REPORT_TYPE, COL_CASE_DUE_DATE,
+                                COL_INDIVIDUAL_ASSIGNMENT, COL_REMARKS)
+from case_assigner.writer import open_output_writer, resolve_writer_backend
+
+PRESETS = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+CHUNK_ROWS = 50_000
+LS_SHEET = "Adverse Event"
+REVIEWERS = ["Anthoni", "Janakiram", "Narasimha", "Prabhakar", "Rajalakshmi", "Sudhakar"]
+FIRST_AER = 10_000_000
+
+# (value, weight) pools; weights roughly follow a real export
+REPORT_CLASSES = [("Literature", 0.30), ("Non-AE Case", 0.20), (None, 0.10), ("", 0.05), ("Spontaneous", 0.25), ("Clinical Study", 0.10)]
+COMPANY_UNITS = [("BMS US", 0.35), ("BMS EU", 0.25), ("bms Japan", 0.10), ("Celgene", 0.15), ("Partner Pharma", 0.15)]
+ASSIGNED_TO = [(None, 0.55), ("", 0.05), ("john.doe@bms.com", 0.10), ("case.intake@bms.com", 0.10), ("Bob", 0.10), ("Intake Team", 0.10)]
+SERIOUSNESS = [("Serious", 0.4), ("Non-serious", 0.6)]
+REPORT_TYPES = [("Spontaneous", 0.5), ("Literature", 0.3), ("Study", 0.2)]
+EXTRA_COLUMNS = ["Product", "Country", "Event PT", "Receipt Date", "Narrative"]
+PRODUCTS = np.array(["Eliquis", "Opdivo", "Revlimid", "Pomalyst", "Sprycel", "Orencia"], dtype=object)
+COUNTRIES = np.array(["US", "DE", "FR", "JP", "IN", "BR", "GB"], dtype=object)
+EVENTS = np.array(["Headache", "Nausea", "Rash", "Fatigue", "Dizziness", "Pyrexia", "Off label use"], dtype=object)
+
+LS_COLUMNS = [COL_AER, COL_REPORT_CLASS, COL_ASSIGNED_TO, COL_COMPANY_UNIT, COL_DUE_DAYS,
+              COL_CASE_SERIOUSNESS, COL_REPORT_TYPE, COL_CASE_DUE_DATE] + EXTRA_COLUMNS
+
+
+def _pick(rng, pool, size):
+    values = np.array([value for value, _ in pool], dtype=object)
+    weights = np.array([weight for _, weight in pool])
+    return rng.choice(values, size, p=weights / weights.sum())
+
+
+def lifesphere_chunk(rng, start, size):
+    """Returns `size` export rows starting at row number `start` as a DataFrame of LS_COLUMNS."""
+    due_days = rng.integers(-10, 45, size)
+    return pd.DataFrame({
+        COL_AER: (np.arange(start, start + size) + FIRST_AER).astype(str),
+        COL_REPORT_CLASS: _pick(rng, REPORT_CLASSES, size),
+        COL_ASSIGNED_TO: _pick(rng, ASSIGNED_TO, size),
+        COL_COMPANY_UNIT: _pick(rng, COMPANY_UNITS, size),
+        COL_DUE_DAYS: np.char.add(due_days.astype(str), " day(s)").astype(object),
+        COL_CASE_SERIOUSNESS: _pick(rng, SERIOUSNESS, size),
+        COL_REPORT_TYPE: _pick(rng, REPORT_TYPES, size),
+        COL_CASE_DUE_DATE: (pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, size), unit='D')).strftime("%d-%b-%Y"),
+        "Product": rng.choice(PRODUCTS, size),
+        "Country": rng.choice(COUNTRIES, size),
+        "Event PT": rng.choice(EVENTS, size),
+        "Receipt Date": (pd.Timestamp("2023-12-01") + pd.to_timedelta(rng.integers(0, 365, size), unit='D')).strftime("%d-%b-%Y"),
+        "Narrative": np.char.add("Synthetic case narrative #", np.arange(start, start + size).astype(str)).astype(object),
+    }, columns=LS_COLUMNS)
+
+
+def lifesphere_rows(rows, seed):
+    """Yields the export sheet rows: title rows, header, then the data in chunks."""
+    titles = ["Lifesphere Adverse Event Export (synthetic)", f"Rows: {rows}", f"Seed: {seed}"]
+    for i in range(LS_HEADER_ROWS): yield (titles[i] if i < len(titles) else "-",)
+    yield tuple(LS_COLUMNS)
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, CHUNK_ROWS):
+        chunk = lifesphere_chunk(rng, start, min(CHUNK_ROWS, rows - start))
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def previous_frames(rows, seed, assigned_share=0.15, closed_share=0.05):
+    """
+    Returns (priority_df, pending_df) of a previous run: `assigned_share` of today's AER#s
+    were assigned before, plus `closed_share` AER#s that no longer appear in the export.
+    """
+    rng = np.random.default_rng(seed + 1)
+    assigned = rng.choice(rows, int(rows * assigned_share), replace=False) + FIRST_AER
+    closed = np.arange(rows, rows + int(rows * closed_share)) + FIRST_AER
+    aers = np.concatenate([assigned, closed])
+    rng.shuffle(aers)
+    df = pd.DataFrame({
+        COL_AER: aers.astype(str),
+        COL_REPORT_CLASS: _pick(rng, REPORT_CLASSES[:3], len(aers)),
+        COL_INDIVIDUAL_ASSIGNMENT: rng.choice(np.array(REVIEWERS, dtype=object), len(aers)),
+        COL_REMARKS: None,
+    })
+    split = int(len(df) * 0.8)
+    pending = df.iloc[split:].copy()
+    pending[COL_REMARKS] = 'Pending from prev. allocation'
+    return df.iloc[:split], pending
+
+
+def generate(rows, output_dir, seed=42, writer=None):
+    """Writes the export and previous workbooks for `rows` rows. Returns (lifesphere_path, previous_path)."""
+    os.makedirs(output_dir, exist_ok=True)
+    backend = resolve_writer_backend(writer)
+    ls_path = os.path.join(output_dir, f"lifesphere_{rows}.xlsx")
+    prev_path = os.path.join(output_dir, f"previous_{rows}.xlsx")
+    with open_output_writer(ls_path, backend) as out:
+        out.write_rows(LS_SHEET, lifesphere_rows(rows, seed), header_bold=False)
+    priority, pending = previous_frames(rows, seed)
+    with open_output_writer(prev_path, backend) as out:
+        out.write_frame("Priority Cases", priority)
+        out.write_frame("Pending Cases", pending)
+    return ls_path, prev_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic Lifesphere export + previous assignment workbooks.")
+    parser.add_argument('--rows', type=int, default=None, help="Export rows (overrides --preset).")
+    parser.add_argument('--preset', default='10k', choices=sorted(PRESETS) + ['all'], help="Size preset (default: %(default)s).")
+    parser.add_argument('--output-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'),
+                        help="Directory for the generated workbooks (default: benchmarks/data).")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed (default: %(default)s).")
+    parser.add_argument('--writer', default=None, help="Writer backend (default: auto).")
+    args = parser.parse_args(argv)
+
+    sizes = [args.rows] if args.rows else (list(PRESETS.values()) if args.preset == 'all' else [PRESETS[args.preset]])
+    for rows in sizes:
+        start = time.perf_counter()
+        ls_path, prev_path = generate(rows, args.output_dir, args.seed, args.writer)
+        print(f"{rows:>10} rows -> {ls_path}, {prev_path} ({time.perf_counter() - start:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Core (non-GUI) building blocks of the BMS Case Assigner."""
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""Allows `python -m case_assigner ...` to run the headless CLI."""
+import sys
+
+from case_assigner.cli import main
+
+sys.exit(main())
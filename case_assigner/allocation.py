@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized case allocation kernel (Steps 9 & 10).
+
+Cases are grouped into assignment categories (e.g. Literature, Non-AE Case & Blank).
+For each category a per-reviewer quota is computed; the kernel then turns the
+quotas into one label per case with a single permutation + repeat, and the caller
+writes all labels back with one column assignment.
+
+Quota schedulers:
+  - 'workload' : min-heap over each reviewer's load (pending backlog + cases handed out so far)
+                 divided by their capacity weight; every case goes to the least-loaded reviewer
+  - 'even'     : the original even split (Literature remainder balanced against the previous run)
+"""
+import heapq
+
+import numpy as np
+
+from case_assigner.categories import blank_mask
+
+SCHEDULER_WORKLOAD = 'workload'
+SCHEDULER_EVEN = 'even'
+SCHEDULERS = (SCHEDULER_WORKLOAD, SCHEDULER_EVEN)
+
+
+class AssignmentCategory:
+    """A group of Report Classification values that is split between reviewers on its own."""
+
+    def __init__(self, name, classifications, include_blank=False, balance_with_previous=False):
+        self.name = name
+        self.classifications = list(classifications)
+        self.include_blank = include_blank
+        self.balance_with_previous = balance_with_previous
+
+    def mask(self, report_class):
+        """Boolean Series: rows of `report_class` that belong to this category."""
+        matched = report_class.isin(self.classifications)
+        if self.include_blank:
+            matched |= blank_mask(report_class)
+        return matched
+
+
+# --- Quotas ---
+def equal_quotas(num_cases, reviewers, rng):
+    """Splits num_cases evenly; the remainder goes to randomly chosen reviewers. Returns {reviewer: count}."""
+    base, remainder = divmod(num_cases, len(reviewers))
+    shuffled = [reviewers[i] for i in rng.permutation(len(reviewers))]
+    return {reviewer: base + (1 if i < remainder else 0) for i, reviewer in enumerate(shuffled)}
+
+
+def balanced_quotas(num_cases, reviewers, prev_counts, rng):
+    """
+    Splits num_cases evenly, giving the remainder to reviewers who had fewer cases of this
+    category last time (those at the previous maximum come last). Returns {reviewer: count}.
+    """
+    if not prev_counts: return equal_quotas(num_cases, reviewers, rng)
+    base, remainder = divmod(num_cases, len(reviewers))
+    quotas = {reviewer: base for reviewer in reviewers}
+    max_prev_count = max(prev_counts.values())
+    reviewers_at_max = [r for r, count in prev_counts.items() if count == max_prev_count]
+    reviewers_below_max = [r for r in reviewers if r not in reviewers_at_max]
+    reviewers_below_max = [reviewers_below_max[i] for i in rng.permutation(len(reviewers_below_max))]
+    eligible_for_remainder = reviewers_below_max + reviewers_at_max
+    for i in range(remainder):
+        quotas[eligible_for_remainder[i % len(eligible_for_remainder)]] += 1
+    return quotas
+
+
+def workload_quotas(num_cases, reviewers, loads, weights, rng):
+    """
+    Hands out num_cases one at a time to the reviewer whose weighted load would be lowest
+    afterwards ((load + 1) / weight), which minimizes the most-loaded reviewer's queue.
+    `loads` is {reviewer: open cases} and is updated in place; `weights` is {reviewer: capacity}
+    (missing = 1.0). Ties are broken in a random order. O(n log k). Returns {reviewer: count}.
+    """
+    quotas = {reviewer: 0 for reviewer in reviewers}
+    heap = []
+    for rank, i in enumerate(rng.permutation(len(reviewers))):
+        reviewer = reviewers[i]
+        weight = weights.get(reviewer, 1.0)
+        heap.append(((loads.get(reviewer, 0) + 1) / weight, rank, reviewer, weight))
+    heapq.heapify(heap)
+    for _ in range(num_cases):
+        _, rank, reviewer, weight = heap[0]
+        quotas[reviewer] += 1
+        loads[reviewer] = loads.get(reviewer, 0) + 1
+        heapq.heapreplace(heap, ((loads[reviewer] + 1) / weight, rank, reviewer, weight))
+    return quotas
+
+
+# --- Kernel ---
+def quota_labels(quotas, num_cases, rng):
+    """
+    Returns one reviewer label per case: the quota-expanded label vector (np.repeat)
+    scattered through a random permutation, so every case has the same chance of any reviewer.
+    """
+    reviewers = np.array(list(quotas.keys()), dtype=object)
+    counts = np.fromiter(quotas.values(), dtype=np.int64, count=len(quotas))
+    labels = np.repeat(reviewers, counts)[:num_cases]
+    shuffled = np.empty(num_cases, dtype=object)
+    shuffled[rng.permutation(num_cases)[:len(labels)]] = labels
+    return shuffled
+
+
+def build_assignment_labels(num_rows, allocations, rng):
+    """
+    Builds the label array for a whole frame in one pass per category.
+    `allocations` is a list of (row_positions, quotas); rows not in any category stay None.
+    """
+    labels = np.full(num_rows, None, dtype=object)
+    for positions, quotas in allocations:
+        if len(positions): labels[positions] = quota_labels(quotas, len(positions), rng)
+    return labels
+
+
+def previous_category_counts(df_prev, category, reviewers, class_col, reviewer_col):
+    """Counts the previous run's cases of `category` per selected reviewer ({} if unavailable)."""
+    if df_prev.empty or class_col not in df_prev.columns or reviewer_col not in df_prev.columns: return {}
+    prev_rows = category.mask(df_prev[class_col]) & df_prev[reviewer_col].isin(reviewers)
+    if not prev_rows.any(): return {}
+    prev_counts = df_prev.loc[prev_rows, reviewer_col].value_counts()
+    return {reviewer: int(prev_counts.get(reviewer, 0)) for reviewer in reviewers}
+
+
+def pending_backlog(reviewer_series, pending_mask, reviewers):
+    """Counts the cases each selected reviewer is still carrying (rows flagged by `pending_mask`)."""
+    counts = reviewer_series[pending_mask].value_counts()
+    return {reviewer: int(counts.get(reviewer, 0)) for reviewer in reviewers}
+
+
+def describe_quotas(quotas):
+    """Compact text for logs/summaries."""
+    return ', '.join(f"{reviewer}: {count}" for reviewer, count in quotas.items())
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Batch mode: runs perform_assignment for a directory (or glob) of Lifesphere exports.
+
+Exports are ordered by the date in their file name (e.g. '2024-10-17', '20241017',
+'17 Oct 2024'; the file date otherwise) and each day runs with the previous day's
+output workbook as its "previous assignment", so the chain is sequential. What does
+not depend on the chain runs ahead on a process pool: every export is parsed in
+parallel into the workbook cache's on-disk sidecar, so each day's Step 1 is a cache
+hit by the time the chain reaches it. With `chain=False` the days are independent
+(same previous file for all, no delta mode) and whole runs execute in parallel.
+"""
+import concurrent.futures
+import contextlib
+import datetime
+import glob
+import logging
+import os
+import re
+import tempfile
+import time
+
+from case_assigner import core
+from case_assigner.instrument import configure_logging
+
+log = logging.getLogger(__name__)
+
+# (regex, strptime format) tried in order on the export's file name
+DATE_PATTERNS = [
+    (re.compile(r'(\d{4}-\d{2}-\d{2})'), '%Y-%m-%d'),
+    (re.compile(r'(?<!\d)(\d{8})(?!\d)'), '%Y%m%d'),
+    (re.compile(r'(\d{1,2} [A-Za-z]{3} \d{4})'), '%d %b %Y'),
+    (re.compile(r'(\d{1,2}-[A-Za-z]{3}-\d{4})'), '%d-%b-%Y'),
+]
+EXPORT_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+_SUMMARY_COUNTS = {
+    'pending': re.compile(r'^- Cases identified as pending from previous allocation: (\d+)', re.M),
+    'assigned': re.compile(r'^- New cases assigned in this run: (\d+)', re.M),
+}
+
+
+def export_date(path):
+    """Returns the run date of an export: the first date found in its file name, else its modification date."""
+    name = os.path.basename(path)
+    for pattern, date_format in DATE_PATTERNS:
+        for match in pattern.finditer(name):
+            try: return datetime.datetime.strptime(match.group(1), date_format).date()
+            except ValueError: continue
+    return datetime.date.fromtimestamp(os.path.getmtime(path))
+
+
+def discover_exports(source):
+    """
+    Returns [(run_date, path), ...] in date order for a directory or glob pattern.
+    Office lock files and this tool's own '*_Assignment.xlsx' outputs are skipped.
+    """
+    pattern = os.path.join(source, '*') if os.path.isdir(source) else source
+    paths = [path for path in glob.glob(pattern)
+             if os.path.isfile(path) and path.lower().endswith(EXPORT_EXTENSIONS)
+             and not os.path.basename(path).startswith('~$') and not path.endswith('_Assignment.xlsx')]
+    return sorted(((export_date(path), path) for path in paths), key=lambda item: (item[0], os.path.basename(item[1])))
+
+
+# --- Pool Workers ---
+def _init_worker(sidecar_dir, sidecar_format):
+    # One in-memory entry per worker: parsed exports are shared through the sidecar files instead
+    core.configure_workbook_cache(max_entries=1, sidecar_dir=sidecar_dir, sidecar_format=sidecar_format)
+    configure_logging(console=False) # The progress of each day goes to its run log only
+
+
+def _preparse(path, ls_sheet_name, engine):
+    """Parses one export into the sidecar cache. Returns (path, seconds, error)."""
+    start = time.perf_counter()
+    try:
+        core.load_lifesphere_frame(path, ls_sheet_name, engine)
+        return path, time.perf_counter() - start, None
+    except Exception as e:
+        return path, time.perf_counter() - start, str(e)
+
+
+def _run_day(run_date, path, prev_file, ls_sheet_name, prio_sheet_name, pend_sheet_name, reviewers, output_dir, options):
+    """Runs one day. Returns a result dict (the console output of the run is discarded; see its run log)."""
+    start = time.perf_counter()
+    success, message = core.perform_assignment(
+        path, prev_file, ls_sheet_name, prio_sheet_name, pend_sheet_name, reviewers, output_dir,
+        run_date=run_date, **options,
+    )
+    counts = {key: int(match.group(1)) if (match := regex.search(message)) else None for key, regex in _SUMMARY_COUNTS.items()}
+    return {
+        'run_date': run_date, 'path': path, 'previous': prev_file, 'success': success, 'seconds': time.perf_counter() - start,
+        'output': core.assignment_output_path(output_dir, run_date) if success else None,
+        'error': None if success else message.split('\n')[0], **counts,
+    }
+
+
+# --- Batch Driver ---
+def run_batch(source, output_dir, reviewers, ls_sheet_name="Adverse Event", prio_sheet_name="Priority Cases",
+              pend_sheet_name="Pending Cases", initial_previous='', chain=True, workers=None, **options):
+    """
+    Runs every export found by `source` (see discover_exports).
+    `initial_previous` is the previous assignment workbook of the first day (optional).
+    `options` are passed on to perform_assignment (engine, delta, scheduler, trace_aers).
+    Returns: (all_succeeded_boolean, consolidated_summary_string)
+    """
+    exports = discover_exports(source)
+    if not exports: return False, f"Error: No Lifesphere exports found for '{source}'."
+    dates = [run_date for run_date, _ in exports]
+    duplicate_dates = sorted({d for d in dates if dates.count(d) > 1})
+    if duplicate_dates and chain:
+        return False, f"Error: Several exports share a run date ({', '.join(d.isoformat() for d in duplicate_dates)}); each day needs exactly one export."
+
+    if not chain:
+        # Parallel days must not read each other's results from the history store
+        if options.get('delta'): return False, "Error: Delta mode needs the runs chained by date; it cannot be used with independent runs."
+        options['delta'] = False
+        if not initial_previous and core.load_history_settings()['db_file']:
+            return False, "Error: Independent runs need a previous assignment file (otherwise each day would read the history store while the others write to it)."
+
+    cache_settings = core.load_cache_settings()
+    workers = workers or min(len(exports), os.cpu_count() or 1)
+    log.info(f"Batch: {len(exports)} exports, {workers} worker processes, {'chained by date' if chain else 'independent runs'}.")
+
+    with contextlib.ExitStack() as stack:
+        sidecar_dir = cache_settings['sidecar_dir']
+        if not sidecar_dir: # The pre-parse results reach the chain through the sidecar cache
+            sidecar_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix='case_assigner_batch_'))
+        pool = stack.enter_context(concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(sidecar_dir, cache_settings['sidecar_format'])))
+
+        batch_start = time.perf_counter()
+        parse_seconds, results = {}, []
+        if chain:
+            parse_futures = [pool.submit(_preparse, path, ls_sheet_name, options.get('engine')) for _, path in exports]
+            prev_file = initial_previous
+            for index, (run_date, path) in enumerate(exports):
+                log.info(f"{run_date.isoformat()}: {os.path.basename(path)} (previous: {os.path.basename(prev_file) if prev_file else 'none'})")
+                result = pool.submit(_run_day, run_date, path, prev_file, ls_sheet_name, prio_sheet_name, pend_sheet_name,
+                                     reviewers, output_dir, options).result()
+                results.append(result)
+                if not result['success']:
+                    results += [{'run_date': d, 'path': p, 'success': None, 'error': f"skipped: {run_date.isoformat()} failed"} for d, p in exports[index + 1:]]
+                    break
+                prev_file = result['output']
+            for future in parse_futures:
+                path, seconds, _ = future.result() # A parse error is reported by that day's own run
+                parse_seconds[path] = seconds
+        else:
+            futures = [pool.submit(_run_day, run_date, path, initial_previous, ls_sheet_name, prio_sheet_name, pend_sheet_name,
+                                   reviewers, output_dir, options) for run_date, path in exports]
+            results = [future.result() for future in futures]
+        batch_seconds = time.perf_counter() - batch_start
+
+    return all(r['success'] for r in results), batch_summary(results, parse_seconds, batch_seconds, workers)
+
+
+def _cell(value, digits=None):
+    if value is None: return '-'
+    return f"{value:.{digits}f}" if digits is not None else str(value)
+
+
+def batch_summary(results, parse_seconds, batch_seconds, workers):
+    """Builds the consolidated batch summary with per-file timings."""
+    succeeded = [r for r in results if r['success']]
+    lines = [f"Batch Summary: {len(succeeded)} of {len(results)} exports processed in {batch_seconds:.1f}s ({workers} workers)", ""]
+    lines.append(f"  {'Date':<12}{'Export':<36}{'Status':<9}{'Parse s':>9}{'Run s':>9}{'Assigned':>10}{'Pending':>9}")
+    for r in results:
+        status = 'ok' if r['success'] else 'skipped' if r['success'] is None else 'FAILED'
+        lines.append(
+            f"  {r['run_date'].isoformat():<12}{os.path.basename(r['path'])[:35]:<36}{status:<9}"
+            f"{_cell(parse_seconds.get(r['path']), 2):>9}{_cell(r.get('seconds'), 2):>9}"
+            f"{_cell(r.get('assigned')):>10}{_cell(r.get('pending')):>9}"
+        )
+    lines.append("")
+    lines.append(f"Total new cases assigned: {sum(r.get('assigned') or 0 for r in succeeded)}")
+    for r in results:
+        if r.get('error'): lines.append(f"{r['run_date'].isoformat()} {os.path.basename(r['path'])}: {r['error']}")
+    if succeeded: lines.append(f"Last output: {succeeded[-1]['output']}")
+    return '\n'.join(lines)
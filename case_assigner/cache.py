@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Parsed-workbook cache shared by the browse previews and the assignment run.
+
+Frames are keyed on (path, mtime, size, sheet name, read variant) so a changed
+file is never served stale. Recently used frames are kept in memory (LRU) and,
+optionally, written to a columnar sidecar file (Feather/Parquet). The sidecar
+directory also holds a row store of the raw rows that are streamed into the output
+(the Master data) and small values such as the header names, so with a sidecar
+directory a rerun on an unchanged export skips Excel parsing entirely, even after a
+restart. Without one, only the processing frames are cached (in memory) and the
+Master data is streamed from the workbook again.
+Row stores and values are pickled: the sidecar directory must not be writable by
+anyone the user does not trust.
+"""
+import hashlib
+import importlib.util
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+SIDECAR_FORMATS = {
+    'feather': ('.feather', 'pyarrow'),
+    'parquet': ('.parquet', 'pyarrow'),
+}
+DEFAULT_MAX_ENTRIES = 8
+ROW_STORE_EXTENSION = '.rows.pickle'
+VALUE_EXTENSION = '.value.pickle'
+ROW_STORE_BATCH = 10000 # Rows pickled per record, so a row store is written and read in constant memory
+
+
+def sidecar_format_available(sidecar_format):
+    """Returns True if the libraries needed for the sidecar format are installed."""
+    if sidecar_format not in SIDECAR_FORMATS: return False
+    return importlib.util.find_spec(SIDECAR_FORMATS[sidecar_format][1]) is not None
+
+
+class WorkbookCache:
+    """LRU cache of parsed sheets with an optional on-disk columnar sidecar."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, sidecar_dir=None, sidecar_format='feather'):
+        self.max_entries = max(1, int(max_entries))
+        self.sidecar_dir = sidecar_dir or None
+        self.sidecar_format = (sidecar_format or '').strip().lower()
+        if self.sidecar_dir and not sidecar_format_available(self.sidecar_format):
+            log.warning(f"Sidecar format '{self.sidecar_format}' is not available (pyarrow missing?). Disk cache disabled.")
+            self.sidecar_dir = None
+        self._frames = OrderedDict()
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits, self.sidecar_hits, self.misses = 0, 0, 0
+
+    @staticmethod
+    def make_key(path, sheet_name, variant=()):
+        """Builds the cache key; raises FileNotFoundError if the file does not exist."""
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, sheet_name, tuple(variant))
+
+    def get_frame(self, path, sheet_name, loader, variant=()):
+        """
+        Returns a private copy of the parsed sheet, calling `loader()` only on a miss.
+        `variant` must capture every read parameter that changes the result (columns, skiprows, ...).
+        """
+        key = self.make_key(path, sheet_name, variant)
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return frame.copy()
+
+        frame = self._read_sidecar(key)
+        if frame is not None:
+            self.sidecar_hits += 1
+        else:
+            self.misses += 1
+            frame = loader()
+            self._write_sidecar(key, frame)
+
+        with self._lock:
+            self._frames[key] = frame
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.max_entries:
+                self._frames.popitem(last=False)
+        return frame.copy()
+
+    def get_value(self, path, sheet_name, loader, variant=()):
+        """Like get_frame for a small picklable value (e.g. a header row), calling `loader()` only on a miss."""
+        key = self.make_key(path, sheet_name, variant)
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                self.hits += 1
+                return self._values[key]
+
+        value_path, found = self._sidecar_path(key, VALUE_EXTENSION), False
+        if value_path and os.path.exists(value_path):
+            try:
+                with open(value_path, 'rb') as f: value = pickle.load(f)
+                found = True
+                self.sidecar_hits += 1
+            except Exception as e: log.warning(f"Ignoring unreadable cache sidecar '{value_path}': {e}")
+        if not found: value = self._load_value(key, loader)
+
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self.max_entries:
+                self._values.popitem(last=False)
+        return value
+
+    def iter_rows(self, path, sheet_name, loader, variant=()):
+        """
+        Yields the row tuples of `loader()` (e.g. ingest.iter_sheet_rows), or the same rows from the sidecar
+        row store when the file is unchanged. On a miss the rows are written to the row store as they stream
+        past. Rows are never held in memory; without a sidecar directory this simply yields from `loader()`.
+        """
+        key = self.make_key(path, sheet_name, variant)
+        store_path = self._sidecar_path(key, ROW_STORE_EXTENSION)
+        if store_path and os.path.exists(store_path):
+            try: store = open(store_path, 'rb')
+            except OSError as e: log.warning(f"Ignoring unreadable row store '{store_path}': {e}")
+            else:
+                self.sidecar_hits += 1
+                with store:
+                    while True:
+                        try: batch = pickle.load(store)
+                        except EOFError: return
+                        yield from batch
+
+        self.misses += 1
+        store = self._open_row_store(path, store_path)
+        batch = []
+        try:
+            for row in loader():
+                if store is not None:
+                    batch.append(row)
+                    if len(batch) >= ROW_STORE_BATCH: store = self._dump_rows(store, batch)
+                yield row
+            if store is not None: store = self._dump_rows(store, batch)
+            if store is not None:
+                store.close()
+                try: os.replace(store.name, store_path) # Only a complete row store is ever read
+                except OSError as e: log.warning(f"Could not write row store '{store_path}': {e}")
+        finally: # The source failed or the consumer stopped early: no partial row store
+            if store is not None:
+                store.close()
+                if os.path.exists(store.name): os.remove(store.name)
+
+    def contains(self, path, sheet_name, variant=()):
+        """True if get_frame would not call its loader (in memory or in a sidecar file)."""
+        key = self.make_key(path, sheet_name, variant)
+        with self._lock:
+            if key in self._frames: return True
+        sidecar_path = self._sidecar_path(key)
+        return bool(sidecar_path) and os.path.exists(sidecar_path)
+
+    def clear(self):
+        """Drops all in-memory entries (sidecar files are left on disk)."""
+        with self._lock:
+            self._frames.clear()
+            self._values.clear()
+
+    # --- Sidecar Handling ---
+    def _sidecar_path(self, key, extension=None):
+        if not self.sidecar_dir: return None
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.sidecar_dir, digest + (extension or SIDECAR_FORMATS[self.sidecar_format][0]))
+
+    def _load_value(self, key, loader):
+        self.misses += 1
+        value = loader()
+        value_path = self._sidecar_path(key, VALUE_EXTENSION)
+        if not value_path: return value
+        try:
+            os.makedirs(self.sidecar_dir, exist_ok=True)
+            with open(value_path + '.tmp', 'wb') as f: pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(value_path + '.tmp', value_path)
+        except Exception as e: log.warning(f"Could not write cache sidecar for '{os.path.basename(key[0])}': {e}")
+        return value
+
+    def _open_row_store(self, path, store_path):
+        """Opens the temporary file a row store is written to, or returns None (no sidecar directory, not writable)."""
+        if not store_path: return None
+        try:
+            os.makedirs(self.sidecar_dir, exist_ok=True)
+            return open(store_path + '.tmp', 'wb')
+        except OSError as e:
+            log.warning(f"Could not write row store for '{os.path.basename(path)}': {e}")
+            return None
+
+    def _dump_rows(self, store, batch):
+        """Appends one batch to a row store being written; returns the file, or None after a failure (file removed)."""
+        try:
+            pickle.dump(batch, store, pickle.HIGHEST_PROTOCOL)
+            return store
+        except Exception as e:
+            log.warning(f"Could not write row store '{store.name}': {e}")
+            store.close()
+            os.remove(store.name)
+            return None
+        finally: batch.clear()
+
+    def _read_sidecar(self, key):
+        sidecar_path = self._sidecar_path(key)
+        if not sidecar_path or not os.path.exists(sidecar_path): return None
+        try:
+            if self.sidecar_format == 'feather': return pd.read_feather(sidecar_path)
+            return pd.read_parquet(sidecar_path)
+        except Exception as e:
+            log.warning(f"Ignoring unreadable cache sidecar '{sidecar_path}': {e}")
+            return None
+
+    def _write_sidecar(self, key, frame):
+        sidecar_path = self._sidecar_path(key)
+        if not sidecar_path: return
+        try:
+            os.makedirs(self.sidecar_dir, exist_ok=True)
+            tmp_path = sidecar_path + '.tmp'
+            if self.sidecar_format == 'feather': frame.to_feather(tmp_path)
+            else: frame.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, sidecar_path) # Atomic, so a half-written sidecar is never read
+        except Exception as e:
+            # Mixed-type object columns cannot always be stored columnar; memory caching still applies
+            log.warning(f"Could not write cache sidecar for '{os.path.basename(key[0])}': {e}")
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Categorical storage for the low-cardinality case columns.
+
+Report Classification, Company Unit, Assigned To and Individual Assignment hold a
+handful of distinct values over many rows. Stored as pandas Categorical they take one
+small integer code per row, and comparisons (filter rules, category masks,
+value_counts, groupby) are evaluated once per distinct value and gathered by code.
+Categories are kept sorted so sorting by a categorical column orders rows exactly
+like the plain strings did.
+"""
+import numpy as np
+import pandas as pd
+
+
+def is_categorical(series):
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def as_category(series, known=()):
+    """Returns `series` as a Categorical whose categories are the sorted union of `known` and its values."""
+    if is_categorical(series) and not set(known).difference(series.cat.categories): return series
+    values = series.astype(object).where(series.notna(), None)
+    categories = sorted(set(values.dropna()).union(known), key=str)
+    return pd.Series(pd.Categorical(values, categories=categories), index=series.index, name=series.name)
+
+
+def compact_columns(df, columns, known=None):
+    """Converts the `columns` of `df` present in it to categoricals in place (`known`: {column: categories})."""
+    for col in columns:
+        if col in df.columns: df[col] = as_category(df[col], (known or {}).get(col, ()))
+    return df
+
+
+def with_categories(series, values):
+    """Returns categorical `series` with any of `values` not yet a category added (so they can be assigned)."""
+    new = [value for value in pd.unique(pd.Series(values, dtype=object).dropna()) if value not in series.cat.categories]
+    return series.cat.add_categories(new) if new else series
+
+
+def per_category(series, evaluate):
+    """
+    Evaluates `evaluate(values_series) -> bool array` once per category (and once for a
+    missing value) and returns the result for every row of categorical `series`.
+    """
+    values = pd.Series(list(series.cat.categories) + [None], dtype=object)
+    results = np.asarray(evaluate(values), dtype=bool)
+    return results[series.cat.codes.to_numpy()] # Code -1 (missing) picks the last entry
+
+
+def blank_mask(series):
+    """Boolean array: missing or whitespace-only values."""
+    if is_categorical(series): return per_category(series, blank_mask)
+    return (series.isna() | (series.astype(str).str.strip() == '')).to_numpy()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Chunked, bounded-memory load and filter of the Lifesphere export ([Input] chunk_rows).
+
+The export is streamed in blocks of rows (ingest.iter_sheet_blocks). Each block is
+normalized by the sheet schema and run through the filter rules, and only the rows
+that pass are kept, so memory follows the number of candidate cases instead of the
+size of the export. The Master data sheet is streamed into the output separately
+(Step 11). What the later steps need from the rejected rows is kept compactly: the
+per-rule rejection counts and the rows of traced AER#s. Delta mode is not used in
+chunked mode, so no row fingerprints are collected.
+"""
+import pandas as pd
+
+from case_assigner.categories import compact_columns
+
+
+class ChunkedFilter:
+    """Runs the parse, cleanup and filter rules block by block and keeps the rows that pass."""
+
+    def __init__(self, schema, rules, aer_col, traced_aers=()):
+        self.schema = schema
+        self.rules = rules
+        self.aer_col = aer_col
+        self.traced_aers = list(traced_aers)
+        self.total_rows, self.valid_rows, self.blocks = 0, 0, 0
+        self.rule_rejections = [(rule, 0) for rule in rules.rules]
+        self._traced = [] # (rows, pre_rule_mask, keep_mask) of traced AER#s, per block
+
+    def run(self, blocks):
+        """Filters every block of `blocks` and returns the kept rows as one DataFrame (row labels of a full read)."""
+        kept = []
+        for block in blocks:
+            self.schema.normalize(block)
+            aer_clean = block[self.aer_col]
+            valid = (aer_clean != '').to_numpy()
+            keep_mask, rejections = self.rules.evaluate(block, valid)
+            self.rule_rejections = [(rule, total + rejected) for (rule, total), (_, rejected) in zip(self.rule_rejections, rejections)]
+            self.total_rows += len(block)
+            self.valid_rows += int(valid.sum())
+            self.blocks += 1
+            if self.traced_aers:
+                traced = aer_clean.isin(self.traced_aers).to_numpy()
+                if traced.any(): self._traced.append((block[traced], pd.Series(valid[traced], index=block.index[traced]), keep_mask[traced]))
+            kept.append(block.loc[keep_mask.to_numpy()])
+        df = pd.concat(kept) if len(kept) > 1 else kept[0]
+        # Categories differ between blocks (concat falls back to object) and untyped columns are still object
+        df = df.infer_objects()
+        return compact_columns(df, list(self.schema.categories), self.schema.categories)
+
+    def traced_rows(self):
+        """(rows, pre_rule_mask, keep_mask) of the traced AER#s over all blocks, for the tracer's Step 1 & 2 hooks."""
+        if not self._traced: return pd.DataFrame(columns=[self.aer_col]), pd.Series(dtype=bool), pd.Series(dtype=bool)
+        rows, pre_rule_mask, keep_mask = zip(*self._traced)
+        return pd.concat(rows), pd.concat(pre_rule_mask), pd.concat(keep_mask)
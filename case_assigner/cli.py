@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Headless command-line entry point for scheduled (display-less) assignment runs.
+
+Usage:
+    python -m case_assigner --lifesphere export.xlsx --previous "17 Oct 2024_Assignment.xlsx" --output-dir out
+    python -m case_assigner --batch "exports/*.xlsx" --previous "16 Oct 2024_Assignment.xlsx" --output-dir out
+    python -m case_assigner --watch inbox --output-dir outbox   (runs until Ctrl+C; defaults in [Watch])
+    python main.py --lifesphere export.xlsx ...   (main.py switches to this mode when given arguments)
+"""
+import argparse
+import os
+import sys
+
+from case_assigner.allocation import SCHEDULERS
+from case_assigner.core import load_reviewers, load_watch_settings, perform_assignment
+from case_assigner.instrument import configure_logging
+from case_assigner.trace import parse_aer_list
+
+
+def build_parser():
+    """Builds the argument parser for the headless mode."""
+    parser = argparse.ArgumentParser(
+        prog='case_assigner',
+        description="Run the BMS case assignment without the GUI.",
+    )
+    parser.add_argument('--lifesphere', default='', help="Lifesphere export workbook (.xlsx).")
+    parser.add_argument('--batch', default='', help="Directory or glob of Lifesphere exports to run in date order (instead of --lifesphere).")
+    parser.add_argument('--workers', type=int, default=None, help="Batch mode: worker processes (default: one per CPU).")
+    parser.add_argument('--independent', action='store_true', help="Batch mode: run the exports independently instead of chaining each day's output into the next day.")
+    parser.add_argument('--watch', nargs='?', const=True, default=None, metavar='INBOX',
+                        help="Keep running and assign every new export dropped into INBOX (default: [Watch] inbox in reviewers.ini).")
+    parser.add_argument('--poll', type=float, default=None, help="Watch mode: seconds between inbox checks (default: [Watch] poll_seconds).")
+    parser.add_argument('--settle', type=float, default=None, help="Watch mode: seconds an export must stay unchanged before it is assigned (default: [Watch] settle_seconds).")
+    parser.add_argument('--ls-sheet', default="Adverse Event", help="Lifesphere sheet name (default: %(default)s).")
+    parser.add_argument('--previous', default='', help="Previous assignment workbook (optional; in batch mode: of the first day).")
+    parser.add_argument('--prio-sheet', default="Priority Cases", help="Previous Priority sheet name (default: %(default)s).")
+    parser.add_argument('--pend-sheet', default="Pending Cases", help="Previous Pending sheet name (default: %(default)s).")
+    parser.add_argument('--reviewers', default='', help="Comma-separated reviewers (default: the list in reviewers.ini).")
+    parser.add_argument('--output-dir', default=None, help="Directory for the output workbook (default: current directory; watch mode: [Watch] outbox).")
+    parser.add_argument('--engine', default=None, help="Excel reader engine override (auto, calamine, openpyxl).")
+    parser.add_argument('--delta', dest='delta', action='store_true', default=None, help="Only process cases changed since the previous run (needs the history store).")
+    parser.add_argument('--no-delta', dest='delta', action='store_false', help="Process every case even if delta mode is enabled in reviewers.ini.")
+    parser.add_argument('--trace', default=None, help="Comma-separated AER#s to trace through the run (default: [Trace] aers in reviewers.ini).")
+    parser.add_argument('--scheduler', choices=SCHEDULERS, default=None, help="Reviewer quota scheduler override (default: [Assignment] scheduler in reviewers.ini).")
+    parser.add_argument('--verbose', '-v', action='store_true', help="Also show the detailed diagnostics of each step.")
+    return parser
+
+
+def main(argv=None):
+    """Runs one assignment (or a batch, or the inbox watcher) from command-line arguments. Returns the process exit code."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if [bool(args.lifesphere), bool(args.batch), args.watch is not None].count(True) != 1:
+        parser.error("give exactly one of --lifesphere, --batch or --watch")
+    configure_logging(verbose=args.verbose)
+    watch_settings = load_watch_settings() if args.watch is not None else {}
+    if args.watch is not None:
+        args.watch = watch_settings['inbox'] if args.watch is True else args.watch
+        if not args.watch: parser.error("--watch needs an inbox directory (or [Watch] inbox in reviewers.ini)")
+        if not os.path.isdir(args.watch):
+            print(f"Error: Inbox directory does not exist: {args.watch}", file=sys.stderr); return 2
+    if args.output_dir is None: args.output_dir = watch_settings.get('outbox') or '.'
+
+    if args.lifesphere and not os.path.exists(args.lifesphere):
+        print(f"Error: Lifesphere file not found at {args.lifesphere}", file=sys.stderr); return 2
+    if args.previous and not os.path.exists(args.previous):
+        print(f"Error: Previous Assignment file does not exist: {args.previous}", file=sys.stderr); return 2
+    if not os.path.isdir(args.output_dir):
+        print(f"Error: Output directory does not exist: {args.output_dir}", file=sys.stderr); return 2
+
+    reviewers = [r.strip() for r in args.reviewers.split(',') if r.strip()] or load_reviewers()
+    options = dict(engine=args.engine, delta=args.delta, scheduler=args.scheduler,
+                   trace_aers=None if args.trace is None else parse_aer_list(args.trace))
+
+    if args.watch:
+        from case_assigner.watch import InboxWatcher
+        InboxWatcher(
+            args.watch, args.output_dir, reviewers, args.ls_sheet, args.prio_sheet, args.pend_sheet, initial_previous=args.previous,
+            poll_seconds=args.poll if args.poll is not None else watch_settings['poll_seconds'],
+            settle_seconds=args.settle if args.settle is not None else watch_settings['settle_seconds'], **options,
+        ).serve_forever()
+        return 0
+    if args.batch:
+        from case_assigner.batch import run_batch
+        success, message = run_batch(
+            args.batch, args.output_dir, reviewers, args.ls_sheet, args.prio_sheet, args.pend_sheet,
+            initial_previous=args.previous, chain=not args.independent, workers=args.workers, **options,
+        )
+    else:
+        success, message = perform_assignment(
+            args.lifesphere, args.previous, args.ls_sheet, args.prio_sheet, args.pend_sheet,
+            reviewers, args.output_dir, **options,
+        )
+    print(message, file=sys.stdout if success else sys.stderr)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
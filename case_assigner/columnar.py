@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar (Parquet / Arrow IPC) export of the assignment results.
+
+Next to the output workbook, Step 11 can write the Master data, Priority Cases,
+Pending Cases and the dashboard counts as one file per table and run date:
+    <columnar_dir>/<table>/run_date=YYYY-MM-DD/part-0.parquet   (or part-0.arrow)
+The run_date=... directories are Hive partitions, so months of runs load as one
+dataset, e.g. pyarrow.dataset.dataset('<columnar_dir>/priority', partitioning='hive'),
+and Arrow IPC files can be memory-mapped. Column types do not depend on the day's
+data: text is string, declared numeric columns keep their type and an all-empty
+column stays string. The Master data is written while it is streamed into the
+workbook, so the export is parsed once. Rerunning a date replaces its partition.
+pyarrow is an optional dependency.
+"""
+import importlib.util
+import logging
+import os
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+COLUMNAR_FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+TABLE_MASTER = 'master'
+TABLE_PRIORITY = 'priority'
+TABLE_PENDING = 'pending'
+TABLE_DASHBOARD = 'dashboard'
+PARTITION_FILE = 'part-0'
+MASTER_BATCH_ROWS = 10000 # Master data rows buffered per record batch
+
+
+def columnar_format_available(columnar_format):
+    """Returns True if the format is known and pyarrow is installed."""
+    return columnar_format in COLUMNAR_FORMATS and importlib.util.find_spec('pyarrow') is not None
+
+
+def _column_names(header):
+    """Column names from a header row: blanks become 'Column <n>', repeats get a '.<k>' suffix (like pandas)."""
+    names, seen = [], {}
+    for position, value in enumerate(header):
+        name = str(value).strip() if value is not None and str(value).strip() else f"Column {position + 1}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else: seen[name] = 0
+        names.append(name)
+    return names
+
+
+class _TableFile:
+    """One partition file, written to a hidden temporary name and moved into place when complete."""
+
+    def __init__(self, path, columnar_format, schema):
+        import pyarrow as pa
+        self.path = path
+        self.schema = schema
+        self.tmp_path = os.path.join(os.path.dirname(path), '.' + os.path.basename(path) + '.tmp') # Hidden from dataset readers
+        self._sink, self._closed = None, False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if columnar_format == 'parquet':
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self.tmp_path, schema)
+        else:
+            self._sink = pa.OSFile(self.tmp_path, 'wb')
+            self._writer = pa.ipc.new_file(self._sink, schema)
+
+    def write(self, table):
+        self._writer.write_table(table)
+
+    def commit(self):
+        try:
+            self._close()
+            for name in os.listdir(os.path.dirname(self.path)): # A partition written in the other format
+                if name.startswith(PARTITION_FILE + '.') and name != os.path.basename(self.path): os.remove(os.path.join(os.path.dirname(self.path), name))
+            os.replace(self.tmp_path, self.path)
+        except Exception:
+            self.abort()
+            raise
+
+    def abort(self):
+        try: self._close()
+        finally:
+            if os.path.exists(self.tmp_path): os.remove(self.tmp_path)
+
+    def _close(self):
+        if self._closed: return
+        self._closed = True
+        self._writer.close()
+        if self._sink is not None: self._sink.close()
+
+
+class ColumnarExport:
+    """Writes the result tables of one run date under `root_dir` (see the module docstring)."""
+
+    def __init__(self, root_dir, run_date, columnar_format='parquet'):
+        self.root_dir = root_dir
+        self.run_date = run_date
+        self.columnar_format = columnar_format
+        self.written = {} # table -> rows written
+        self.errors = []  # Messages of tables that could not be written (the workbook is not affected)
+
+    def partition_path(self, table):
+        return os.path.join(self.root_dir, table, f"run_date={self.run_date.isoformat()}", PARTITION_FILE + COLUMNAR_FORMATS[self.columnar_format])
+
+    def write_frame(self, table, df, types=None):
+        """Writes a DataFrame as `table`; `types` maps columns to Arrow type names (e.g. 'float64'), the rest are strings."""
+        import pyarrow as pa
+        types = types or {}
+        try:
+            fields = [pa.field(str(col), pa.type_for_alias(types.get(col, 'string'))) for col in df.columns]
+            arrays = [pa.array(df[col].astype('string') if pa.types.is_string(field.type) else pd.to_numeric(df[col], errors='coerce'),
+                               type=field.type, from_pandas=True) for col, field in zip(df.columns, fields)]
+            part = pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+        except Exception as e:
+            self._failed(table, e)
+            return
+        self._write(table, part)
+
+    def tee_rows(self, table, rows):
+        """
+        Yields `rows` (header first, as from ingest.iter_sheet_rows) unchanged while writing them as
+        `table` with string columns. A write error is recorded in `errors`; the rows keep flowing.
+        """
+        import pyarrow as pa
+        table_file, buffer, names, row_count = None, [], None, 0
+        try:
+            for row in rows:
+                if names is None:
+                    names = _column_names(row)
+                    try: table_file = _TableFile(self.partition_path(table), self.columnar_format, pa.schema([pa.field(name, pa.string()) for name in names]))
+                    except Exception as e: self._failed(table, e)
+                elif table_file is not None:
+                    buffer.append(row)
+                    row_count += 1
+                    if len(buffer) >= MASTER_BATCH_ROWS: table_file = self._flush(table, table_file, names, buffer)
+                yield row
+            if table_file is not None: table_file = self._flush(table, table_file, names, buffer)
+            if table_file is not None:
+                committing, table_file = table_file, None
+                try:
+                    committing.commit()
+                    self.written[table] = row_count
+                except Exception as e: self._failed(table, e)
+        finally: # The source failed or the consumer stopped early: no partial partition
+            if table_file is not None: table_file.abort()
+
+    def _flush(self, table, table_file, names, buffer):
+        """Writes the buffered rows as one record batch; returns the file, or None after a failure (file removed)."""
+        import pyarrow as pa
+        try:
+            columns = [[None if i >= len(row) or row[i] is None else str(row[i]) for row in buffer] for i in range(len(names))]
+            table_file.write(pa.Table.from_arrays([pa.array(column, type=pa.string()) for column in columns], schema=table_file.schema))
+            buffer.clear()
+            return table_file
+        except Exception as e:
+            self._failed(table, e)
+            table_file.abort()
+            return None
+
+    def _write(self, table, part):
+        try: table_file = _TableFile(self.partition_path(table), self.columnar_format, part.schema)
+        except Exception as e:
+            self._failed(table, e)
+            return
+        try:
+            table_file.write(part)
+            table_file.commit()
+            self.written[table] = part.num_rows
+        except Exception as e:
+            table_file.abort() # No-op after a failed commit (already cleaned up)
+            self._failed(table, e)
+
+    def _failed(self, table, error):
+        self.errors.append(f"{table}: {error}")
+        log.warning(f"Could not write the columnar '{table}' table: {error}")
@@ -0,0 +1,954 @@
+# -*- coding: utf-8 -*-
+"""
+Core (GUI-free) case assignment logic: configuration, workbook loading and perform_assignment.
+Shared names and the reviewer/trace settings live in case_assigner.settings and are re-exported here.
+Only pandas, numpy and openpyxl are imported here so batch jobs and the CLI start fast
+and never need a display.
+"""
+import pandas as pd
+import numpy as np
+import datetime
+import os
+import configparser
+import itertools
+import multiprocessing
+import concurrent.futures
+import sqlite3
+import warnings
+import logging
+import traceback # For detailed error logging
+from case_assigner.settings import (DEFAULT_REVIEWERS, CONFIG_FILE, CONFIG_SECTION, CONFIG_INPUT_SECTION, CONFIG_CACHE_SECTION,
+                                    CONFIG_OUTPUT_SECTION, CONFIG_HISTORY_SECTION, CONFIG_ASSIGNMENT_SECTION,
+                                    CONFIG_CAPACITY_SECTION, CONFIG_TRACE_SECTION, CONFIG_WATCH_SECTION, LS_HEADER_ROWS,
+                                    COL_AER, COL_REPORT_CLASS, COL_ASSIGNED_TO, COL_COMPANY_UNIT, COL_INDIVIDUAL_ASSIGNMENT,
+                                    COL_REMARKS, COL_DUE_DAYS, COL_CASE_SERIOUSNESS, COL_REPORT_TYPE, COL_CASE_DUE_DATE,
+                                    TOTAL_STEPS, STEP_LABELS, AssignmentCancelled, CANCELLED_MESSAGE, parse_aer_list,
+                                    load_reviewers, load_trace_settings, save_reviewers)
+from case_assigner.ingest import ENGINE_AUTO, resolve_engine, read_columns, read_header, iter_sheet_rows, iter_sheet_blocks, RowCollector
+from case_assigner.cache import WorkbookCache, DEFAULT_MAX_ENTRIES
+from case_assigner.memstats import peak_rss_mb, format_mb
+from case_assigner.probe import find_header_row
+from case_assigner.rules import load_filter_rules
+from case_assigner.schema import ColumnSpec, SheetSchema, SchemaError, clean_text, parse_due_days, per_value
+from case_assigner.categories import as_category, with_categories
+from case_assigner.keys import aer_keys, first_positions
+from case_assigner.dashboard import DashboardTables, case_counts, ASSIGNED_THIS_RUN, PENDING_FROM_PREVIOUS, TOTAL_COLUMN, COUNT_COLUMN
+from case_assigner.history import AssignmentHistory, frame_records, STATUS_PRIORITY, STATUS_PENDING
+from case_assigner.delta import DeltaBaseline, compute_fingerprints, rules_salt
+from case_assigner.chunked import ChunkedFilter
+from case_assigner.instrument import RunRecorder, run_log_path
+from case_assigner.trace import AerTracer
+from case_assigner.writer import WRITER_AUTO, resolve_writer_backend, open_output_writer
+from case_assigner.columnar import (ColumnarExport, columnar_format_available, TABLE_MASTER, TABLE_PRIORITY, TABLE_PENDING,
+                                    TABLE_DASHBOARD, COLUMNAR_FORMATS)
+from case_assigner.allocation import (AssignmentCategory, SCHEDULER_WORKLOAD, SCHEDULER_EVEN, SCHEDULERS, equal_quotas, balanced_quotas,
+                                     workload_quotas, build_assignment_labels, previous_category_counts,
+                                     pending_backlog, describe_quotas)
+
+# --- Configuration & Setup ---
+
+# Ignore openpyxl warnings (often related to default styles)
+warnings.simplefilter("ignore", category=UserWarning)
+# Suppress SettingWithCopyWarning (use .loc/.copy() appropriately)
+pd.options.mode.chained_assignment = None
+
+# --- Constants ---
+DEFAULT_HISTORY_DB = 'assignment_history.sqlite'
+FILTER_RULES_FILE = 'filter_rules.ini' # Inclusion rules for the Lifesphere export (kept next to CONFIG_FILE)
+COLUMNAR_DIR = 'columnar' # Default columnar export directory, inside the output directory
+
+# Progress and diagnostics of a run; the console output is set up by the entry points (see instrument.configure_logging)
+log = logging.getLogger(__name__)
+
+
+# --- Required Columns for Validation ---
+# Columns absolutely required in the Lifesphere Export sheet
+REQUIRED_LS_COLS = [
+    COL_AER, COL_REPORT_CLASS, COL_ASSIGNED_TO, COL_COMPANY_UNIT, COL_DUE_DAYS
+]
+# Columns absolutely required in BOTH Previous Assignment sheets for the pending check
+REQUIRED_PREV_COLS = [
+    COL_AER, COL_INDIVIDUAL_ASSIGNMENT
+]
+# Additional columns needed ONLY from the Previous Priority sheet for balancing logic
+REQUIRED_PREV_PRIO_EXTRA_COLS = [
+    COL_REPORT_CLASS
+]
+# Columns used to sort the Priority Cases output sheet
+SORT_COLS = [COL_REPORT_CLASS, COL_DUE_DAYS]
+# Columns read from the Lifesphere export for processing (the full sheet is streamed to Master data,
+# and the Priority/Pending sheets get the full export rows of their cases on the way)
+LS_PROCESSING_COLS = list(dict.fromkeys(REQUIRED_LS_COLS + SORT_COLS))
+
+# --- Input Sheet Schemas (converters run once at parse time, see case_assigner.schema) ---
+LS_SCHEMA = SheetSchema('lifesphere', [
+    ColumnSpec(COL_AER, dtype=str, converter=clean_text),
+    ColumnSpec(COL_REPORT_CLASS, categories=[]),
+    ColumnSpec(COL_ASSIGNED_TO, categories=['']), # '' is the fill value of Step 4
+    ColumnSpec(COL_COMPANY_UNIT, categories=[]),
+    ColumnSpec(COL_DUE_DAYS, converter=per_value(parse_due_days)),
+], required=REQUIRED_LS_COLS)
+PREV_SCHEMA = SheetSchema('previous', [
+    ColumnSpec(COL_AER, dtype=str, converter=clean_text),
+    ColumnSpec(COL_INDIVIDUAL_ASSIGNMENT, converter=per_value(clean_text)),
+    ColumnSpec(COL_REPORT_CLASS, categories=[]),
+], required=REQUIRED_PREV_COLS)
+PREVIOUS_VARIANT = ('previous', PREV_SCHEMA.key) # Cache variant of the previous assignment sheets
+PARALLEL_READ_MIN_BYTES = 256 * 1024 # Smaller previous files are read in Step 6 (a worker process costs more than it saves)
+# Report Classification groups split between reviewers (Steps 9 & 10); a case goes to the first matching category
+ASSIGNMENT_CATEGORIES = [
+    AssignmentCategory('Literature', ['Literature'], balance_with_previous=True),
+    AssignmentCategory('Non-AE Case & Blank', ['Non-AE Case'], include_blank=True),
+]
+
+# --- Configuration Handling Functions ---
+def load_input_settings():
+    """Loads the Excel reader settings (engine, parallel reads, chunked mode) from the config file."""
+    settings = {'engine': ENGINE_AUTO, 'parallel_reads': True, 'chunk_rows': 0}
+    config = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            config.read(CONFIG_FILE)
+            settings['engine'] = config.get(CONFIG_INPUT_SECTION, 'engine', fallback=ENGINE_AUTO).strip() or ENGINE_AUTO
+            settings['parallel_reads'] = config.getboolean(CONFIG_INPUT_SECTION, 'parallel_reads', fallback=True)
+            settings['chunk_rows'] = max(0, config.getint(CONFIG_INPUT_SECTION, 'chunk_rows', fallback=0))
+        except Exception as e:
+            log.error(f"Could not load input settings from '{CONFIG_FILE}': {e}")
+    return settings
+
+def load_cache_settings():
+    """Loads the workbook cache settings (LRU size, optional sidecar directory/format) from the config file."""
+    settings = {'max_entries': DEFAULT_MAX_ENTRIES, 'sidecar_dir': '', 'sidecar_format': 'feather'}
+    config = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            config.read(CONFIG_FILE)
+            settings['max_entries'] = config.getint(CONFIG_CACHE_SECTION, 'max_entries', fallback=DEFAULT_MAX_ENTRIES)
+            settings['sidecar_dir'] = config.get(CONFIG_CACHE_SECTION, 'sidecar_dir', fallback='').strip()
+            settings['sidecar_format'] = config.get(CONFIG_CACHE_SECTION, 'sidecar_format', fallback='feather').strip()
+        except Exception as e:
+            log.error(f"Could not load cache settings from '{CONFIG_FILE}': {e}")
+    return settings
+
+def load_output_settings():
+    """Loads the output settings (workbook writer backend, optional columnar export) from the config file."""
+    settings = {'writer': WRITER_AUTO, 'columnar_format': '', 'columnar_dir': ''}
+    config = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            config.read(CONFIG_FILE)
+            settings['writer'] = config.get(CONFIG_OUTPUT_SECTION, 'writer', fallback=WRITER_AUTO).strip() or WRITER_AUTO
+            settings['columnar_format'] = config.get(CONFIG_OUTPUT_SECTION, 'columnar_format', fallback='').strip().lower()
+            settings['columnar_dir'] = config.get(CONFIG_OUTPUT_SECTION, 'columnar_dir', fallback='').strip()
+        except Exception as e:
+            log.error(f"Could not load output settings from '{CONFIG_FILE}': {e}")
+    return settings
+
+def load_history_settings():
+    """
+    Loads the history store settings from the config file.
+    'db_file' is '' when the history store is disabled; 'delta' enables incremental delta mode.
+    """
+    settings = {'db_file': DEFAULT_HISTORY_DB, 'delta': False}
+    config = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            config.read(CONFIG_FILE)
+            if not config.getboolean(CONFIG_HISTORY_SECTION, 'enabled', fallback=True): settings['db_file'] = ''
+            else: settings['db_file'] = config.get(CONFIG_HISTORY_SECTION, 'db_file', fallback=DEFAULT_HISTORY_DB).strip() or DEFAULT_HISTORY_DB
+            settings['delta'] = config.getboolean(CONFIG_HISTORY_SECTION, 'delta', fallback=False)
+        except Exception as e:
+            log.error(f"Could not load history settings from '{CONFIG_FILE}': {e}")
+    return settings
+
+def load_assignment_settings():
+    """
+    Loads the scheduler settings from the config file.
+    'scheduler' is 'even' (default, the original split) or 'workload'; 'capacity' maps reviewer -> capacity weight ([Capacity] section, default 1.0).
+    """
+    settings = {'scheduler': SCHEDULER_EVEN, 'capacity': {}}
+    config = configparser.ConfigParser()
+    config.optionxform = str # Reviewer names keep their case
+    if os.path.exists(CONFIG_FILE):
+        try:
+            config.read(CONFIG_FILE)
+            scheduler = config.get(CONFIG_ASSIGNMENT_SECTION, 'scheduler', fallback=SCHEDULER_EVEN).strip().lower()
+            if scheduler in SCHEDULERS: settings['scheduler'] = scheduler
+            else: log.warning(f"Unknown scheduler '{scheduler}' in '{CONFIG_FILE}', using '{SCHEDULER_EVEN}'.")
+            if config.has_section(CONFIG_CAPACITY_SECTION):
+                for reviewer, weight_str in config.items(CONFIG_CAPACITY_SECTION):
+                    try: weight = float(weight_str)
+                    except ValueError: weight = 0
+                    if weight > 0: settings['capacity'][reviewer] = weight
+                    else: log.warning(f"Ignoring capacity '{weight_str}' for '{reviewer}' (must be a positive number).")
+        except Exception as e:
+            log.error(f"Could not load assignment settings from '{CONFIG_FILE}': {e}")
+    return settings
+
+def load_watch_settings():
+    """Loads the watch-folder settings (inbox/outbox directories, poll and settle seconds) from the config file."""
+    settings = {'inbox': '', 'outbox': '', 'poll_seconds': 5.0, 'settle_seconds': 10.0}
+    config = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            config.read(CONFIG_FILE)
+            settings['inbox'] = config.get(CONFIG_WATCH_SECTION, 'inbox', fallback='').strip()
+            settings['outbox'] = config.get(CONFIG_WATCH_SECTION, 'outbox', fallback='').strip()
+            settings['poll_seconds'] = config.getfloat(CONFIG_WATCH_SECTION, 'poll_seconds', fallback=5.0)
+            settings['settle_seconds'] = config.getfloat(CONFIG_WATCH_SECTION, 'settle_seconds', fallback=10.0)
+        except Exception as e:
+            log.error(f"Could not load watch settings from '{CONFIG_FILE}': {e}")
+    return settings
+
+# --- Helper Function for Column Check ---
+def check_columns(df_columns, required_columns, file_description, sheet_name):
+    """Checks if required columns exist in the DataFrame columns."""
+    missing_cols = [col for col in required_columns if col not in df_columns]
+    if missing_cols:
+        error_msg = (f"Error: Missing required columns in {file_description} "
+                     f"(Sheet: '{sheet_name}'):\n-> {', '.join(missing_cols)}\n\n"
+                     f"Please ensure the column names match exactly (case-sensitive).")
+        return False, error_msg
+    return True, "" # Success
+
+# --- Shared Workbook Cache & Loaders ---
+_workbook_cache = None
+
+def get_workbook_cache():
+    """Returns the workbook cache shared by the previews and the assignment run (created on first use)."""
+    global _workbook_cache
+    if _workbook_cache is None:
+        settings = load_cache_settings()
+        _workbook_cache = WorkbookCache(settings['max_entries'], settings['sidecar_dir'], settings['sidecar_format'])
+    return _workbook_cache
+
+def configure_workbook_cache(**overrides):
+    """Replaces the shared workbook cache, overriding the [Cache] settings given (max_entries, sidecar_dir, sidecar_format)."""
+    global _workbook_cache
+    settings = load_cache_settings()
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    _workbook_cache = WorkbookCache(settings['max_entries'], settings['sidecar_dir'], settings['sidecar_format'])
+    return _workbook_cache
+
+def assignment_output_path(output_dir, run_date):
+    """Returns the output workbook path of a run date."""
+    return os.path.join(output_dir, f"{run_date.strftime('%d %b %Y')}_Assignment.xlsx")
+
+def open_columnar_export(output_settings, output_dir, run_date):
+    """Returns the ColumnarExport configured in [Output] (columnar_format, columnar_dir), or None when it is off or unavailable."""
+    columnar_format = output_settings['columnar_format']
+    if not columnar_format: return None
+    if not columnar_format_available(columnar_format):
+        log.warning(f"Columnar format '{columnar_format}' is not available (expected one of {', '.join(COLUMNAR_FORMATS)}; pyarrow installed?). Columnar export skipped.")
+        return None
+    return ColumnarExport(output_settings['columnar_dir'] or os.path.join(output_dir, COLUMNAR_DIR), run_date, columnar_format)
+
+def lifesphere_header_rows(lifesphere_file, ls_sheet_name):
+    """
+    Returns the number of title rows above the export's header row: the row holding the
+    AER# header cell (only the first rows are scanned), else LS_HEADER_ROWS.
+    Raises ValueError if the sheet does not exist.
+    """
+    try: header_rows = find_header_row(lifesphere_file, ls_sheet_name, COL_AER)
+    except (ValueError, FileNotFoundError): raise
+    except Exception as e: # Unreadable as a zip/XML workbook; the full read reports the real problem
+        log.warning(f"Could not detect the header row of '{ls_sheet_name}': {e}")
+        header_rows = None
+    return LS_HEADER_ROWS if header_rows is None else header_rows
+
+def lifesphere_columns():
+    """The Lifesphere columns the processing reads: processing columns and filter rule columns."""
+    try: rule_columns = load_filter_rules(FILTER_RULES_FILE).columns
+    except ValueError: rule_columns = [] # Reported by perform_assignment when the rules are applied
+    return list(dict.fromkeys(LS_PROCESSING_COLS + rule_columns))
+
+def load_lifesphere_chunked(lifesphere_file, ls_sheet_name, header_rows, chunk_rows, filter_rules, traced_aers=()):
+    """
+    Chunked mode: streams the export in blocks of `chunk_rows` rows and keeps only the rows passing `filter_rules`.
+    Returns: (kept DataFrame, ChunkedFilter with the counts and traced rows).
+    Raises SchemaError if required or rule columns are missing.
+    """
+    blocks = iter_sheet_blocks(lifesphere_file, ls_sheet_name, lifesphere_columns(), skiprows=header_rows, block_rows=chunk_rows)
+    first_block = next(blocks)
+    header_ok, error_msg = check_columns(first_block.columns, LS_SCHEMA.required, "Lifesphere export", ls_sheet_name)
+    if not header_ok: raise SchemaError(error_msg)
+    missing_rule_cols = [col for col in filter_rules.columns if col not in first_block.columns]
+    if missing_rule_cols: raise SchemaError(f"Error: Columns used by filter rules are missing in Lifesphere sheet ('{ls_sheet_name}'): {', '.join(missing_rule_cols)}")
+    chunked = ChunkedFilter(LS_SCHEMA, filter_rules, COL_AER, traced_aers)
+    return chunked.run(itertools.chain([first_block], blocks)), chunked
+
+def load_lifesphere_frame(lifesphere_file, ls_sheet_name, engine=None, header_rows=None):
+    """
+    Reads the processing columns of the Lifesphere export through the workbook cache.
+    `header_rows` is the number of title rows above the header (default: detected, see lifesphere_header_rows).
+    Returns: (DataFrame, engine_name_used)
+    """
+    if header_rows is None: header_rows = lifesphere_header_rows(lifesphere_file, ls_sheet_name)
+    input_settings = load_input_settings()
+    reader_engine = resolve_engine(engine or input_settings['engine'], lifesphere_file)
+    ls_columns = lifesphere_columns()
+
+    def parse():
+        # The header is validated before the full read, so a wrong sheet fails fast
+        header_ok, error_msg = check_columns(read_header(lifesphere_file, ls_sheet_name, header_rows, reader_engine),
+                                             LS_SCHEMA.required, "Lifesphere export", ls_sheet_name)
+        if not header_ok: raise SchemaError(error_msg)
+        df = read_columns(lifesphere_file, ls_sheet_name, ls_columns, skiprows=header_rows, dtype=LS_SCHEMA.dtypes, engine=reader_engine)
+        return LS_SCHEMA.normalize(df)
+
+    df = get_workbook_cache().get_frame(
+        lifesphere_file, ls_sheet_name, parse,
+        variant=('lifesphere', header_rows, tuple(ls_columns), LS_SCHEMA.key),
+    )
+    return df, reader_engine
+
+def read_previous_sheets(prev_assign_file, sheet_names):
+    """
+    Parses sheets of a previous assignment file from one opened workbook (normalized by PREV_SCHEMA).
+    Returns one entry per sheet, in order: the DataFrame, or the exception raised reading that sheet.
+    """
+    try:
+        with pd.ExcelFile(prev_assign_file) as workbook:
+            results = []
+            for sheet_name in sheet_names:
+                try: results.append(PREV_SCHEMA.normalize(workbook.parse(sheet_name, dtype=PREV_SCHEMA.dtypes)))
+                except Exception as e: results.append(e)
+            return results
+    except Exception as e: # The workbook itself cannot be opened (missing, corrupt)
+        return [e] * len(sheet_names)
+
+def _picklable_errors(results):
+    """Exceptions of read_previous_sheets as plain ValueError/Exception, so they survive the way back from the worker process."""
+    return [result if not isinstance(result, Exception) else (ValueError if isinstance(result, ValueError) else Exception)(str(result))
+            for result in results]
+
+def _read_previous_sheets_in_worker(prev_assign_file, sheet_names):
+    return _picklable_errors(read_previous_sheets(prev_assign_file, sheet_names))
+
+_read_pool = None
+
+def start_previous_read(prev_assign_file, sheet_names):
+    """
+    Starts parsing the previous assignment sheets in a worker process, so they are read while the
+    Lifesphere export is parsed here. Returns the future, or None when the sheets are read in
+    Step 6 instead: no file, all sheets cached, a small file ([Input] parallel_reads = false or
+    below PARALLEL_READ_MIN_BYTES) or already running in a worker process (batch mode).
+    The worker process is spawned (never forked from the GUI's threads) and kept for later runs of
+    the GUI or watch mode until shutdown_previous_reads().
+    """
+    global _read_pool
+    if not prev_assign_file or not os.path.exists(prev_assign_file): return None
+    if not load_input_settings()['parallel_reads'] or multiprocessing.parent_process() is not None: return None
+    if os.path.getsize(prev_assign_file) < PARALLEL_READ_MIN_BYTES: return None
+    cache = get_workbook_cache()
+    if all(cache.contains(prev_assign_file, sheet_name, PREVIOUS_VARIANT) for sheet_name in sheet_names): return None
+    try:
+        if _read_pool is None: _read_pool = concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        return _read_pool.submit(_read_previous_sheets_in_worker, prev_assign_file, list(sheet_names))
+    except Exception as e: # E.g. no process support; Step 6 reads the sheets itself
+        log.warning(f"Could not start the background read of the previous assignment file: {e}")
+        shutdown_previous_reads()
+        return None
+
+def drop_previous_read(pending_read):
+    """Drops a background read the run no longer needs (it failed or was cancelled before Step 6)."""
+    if pending_read is None or pending_read.done() or pending_read.cancel(): return
+    # Already being parsed: let that worker finish and exit on its own, the next run starts a fresh one
+    shutdown_previous_reads()
+
+def shutdown_previous_reads():
+    """Stops the background read worker process (when the GUI closes or watch mode stops); queued reads are cancelled."""
+    global _read_pool
+    if _read_pool is None: return
+    pool, _read_pool = _read_pool, None
+    try: pool.shutdown(wait=False, cancel_futures=True)
+    except Exception as e: log.warning(f"Could not stop the background read worker: {e}")
+
+def load_previous_sheets(prev_assign_file, sheet_names, pending_read=None):
+    """
+    Returns the Priority/Pending sheets of a previous assignment file through the workbook cache, in order
+    (each a DataFrame or the exception raised reading it). Sheets not in the cache come from `pending_read`
+    (see start_previous_read) or are parsed here, opening the workbook once for all of them.
+    """
+    parsed = []
+    def parsed_sheets():
+        if not parsed:
+            results = None
+            if pending_read is not None:
+                try: results = pending_read.result()
+                except Exception as e: log.warning(f"Background read of the previous assignment file failed ({e}); reading it again.")
+            parsed.append(results or read_previous_sheets(prev_assign_file, sheet_names))
+        return parsed[0]
+
+    frames = []
+    for index, sheet_name in enumerate(sheet_names):
+        def parse(index=index):
+            result = parsed_sheets()[index]
+            if isinstance(result, Exception): raise result
+            return result
+        try: frames.append(get_workbook_cache().get_frame(prev_assign_file, sheet_name, parse, variant=PREVIOUS_VARIANT))
+        except Exception as e: frames.append(e)
+    return frames
+
+def with_export_columns(df, export_columns, collector):
+    """
+    Returns `df` with every Lifesphere export column, in export order, followed by the columns the
+    run added (Individual Assignment, Remarks). Columns read for processing keep their cleaned values;
+    the others come from the export rows `collector` kept while the Master data was streamed.
+    """
+    columns = {}
+    for cell, name in enumerate(export_columns):
+        if name in df.columns: columns[name] = df[name]
+        elif name not in columns: columns[name] = pd.Series(collector.column(cell, df.index), index=df.index, dtype=object)
+    for name in df.columns:
+        if name not in columns: columns[name] = df[name]
+    return pd.DataFrame(columns, index=df.index)
+
+# --- Core Assignment Logic ---
+def perform_assignment(lifesphere_file, prev_assign_file, ls_sheet_name, prev_prio_sheet_name, prev_pend_sheet_name, selected_reviewers, output_dir, engine=None, progress=None, delta=None, scheduler=None, trace_aers=None, run_date=None):
+    """
+    Performs the case assignment logic based on the input files and parameters.
+    Every numbered step is timed (see case_assigner.instrument): the step timings are appended
+    to the returned message and the run is logged as JSON lines next to the output workbook,
+    together with the progress and diagnostics logged on the way (see instrument.configure_logging).
+    `engine` overrides the Excel reader engine configured in the [Input] section.
+    `delta` overrides the [History] delta setting: rows unchanged since the previous
+    run keep their previous outcome instead of being filtered and matched again.
+    `scheduler` overrides the [Assignment] scheduler ('workload' or 'even').
+    `trace_aers` lists AER#s whose lineage is reported (default: the [Trace] section; empty = off).
+    `run_date` (a date, default today) names the output and orders the run in the history store (batch backfills).
+    `progress(step_number, step_label)` is called as each numbered step starts; it may
+    raise AssignmentCancelled to stop the run before that step (no output is written).
+    Returns: (success_boolean, message_string)
+    """
+    run_date = run_date or datetime.date.today()
+    recorder = RunRecorder(lifesphere_file=lifesphere_file, ls_sheet=ls_sheet_name, previous_file=prev_assign_file or None,
+                           reviewers=list(selected_reviewers), output_dir=output_dir)
+    tracer = AerTracer(load_trace_settings() if trace_aers is None else trace_aers)
+    with recorder.capture_logs():
+        success, message = _run_assignment(lifesphere_file, prev_assign_file, ls_sheet_name, prev_prio_sheet_name, prev_pend_sheet_name,
+                                           selected_reviewers, output_dir, engine, progress, delta, scheduler, run_date, recorder, tracer)
+    cancelled = not success and message.startswith(CANCELLED_MESSAGE)
+    recorder.finish('success' if success else 'cancelled' if cancelled else 'failed')
+    if tracer:
+        message += "\n\n" + tracer.report()
+        recorder.add_records(tracer.records())
+    if recorder.spans: message += "\n\n" + recorder.timing_table()
+    if os.path.isdir(output_dir):
+        log_path = run_log_path(output_dir, run_date)
+        if recorder.write_jsonl(log_path, message): log.info(f"Run log written to {log_path}")
+    return success, message
+
+def _run_assignment(lifesphere_file, prev_assign_file, ls_sheet_name, prev_prio_sheet_name, prev_pend_sheet_name, selected_reviewers, output_dir, engine, progress, delta, scheduler, run_date, recorder, tracer):
+    """
+    The body of perform_assignment; every numbered step is opened as a span on `recorder`.
+    Trace calls are guarded by `if tracer:` so untraced runs never touch the tracer.
+    """
+    def report_step(step, rows_in=None):
+        if progress is not None: progress(step, STEP_LABELS[step])
+        recorder.start_step(step, STEP_LABELS[step], rows_in)
+
+    history_settings = load_history_settings()
+    history_db = history_settings['db_file']
+    use_delta = bool(history_db) and (history_settings['delta'] if delta is None else delta)
+
+    log.info("--- Starting Assignment Process ---")
+    log.info(f"Lifesphere File: {lifesphere_file} (Sheet: '{ls_sheet_name}')")
+    log.info(f"Previous Assignment File: {prev_assign_file} (Priority Sheet: '{prev_prio_sheet_name}', Pending Sheet: '{prev_pend_sheet_name}')")
+    log.info(f"Selected Reviewers: {selected_reviewers}")
+    log.info(f"Output Directory: {output_dir}")
+
+    if tracer: log.info(f"Tracing AER#s: {tracer.aers}")
+
+    previous_read = None
+    try:
+        # --- Step 1: Load Lifesphere Data ---
+        report_step(1)
+        # The previous assignment sheets are parsed in a worker process meanwhile (collected in Step 6)
+        previous_read = start_previous_read(prev_assign_file, [prev_prio_sheet_name, prev_pend_sheet_name])
+        chunk_rows = load_input_settings()['chunk_rows']
+        chunked = None # Chunked mode: the ChunkedFilter that ran the filter rules while loading
+        if chunk_rows:
+            try: filter_rules = load_filter_rules(FILTER_RULES_FILE)
+            except (ValueError, configparser.Error) as e:
+                return False, f"Error in filter rules file '{FILTER_RULES_FILE}': {e}"
+            if use_delta:
+                log.info("Delta mode is not used in chunked mode; all rows are processed.")
+                use_delta = False
+        try:
+            # Only the processing columns are parsed (or reused from the cache); Master data is streamed from the file in Step 11
+            ls_header_rows = lifesphere_header_rows(lifesphere_file, ls_sheet_name)
+            if ls_header_rows != LS_HEADER_ROWS: log.debug(f"Header row detected at row {ls_header_rows + 1} ({ls_header_rows} title rows).")
+            if chunk_rows:
+                # Chunked mode: only the rows passing the filter rules are kept (Steps 1 & 2 run per block)
+                df_ls_raw, chunked = load_lifesphere_chunked(lifesphere_file, ls_sheet_name, ls_header_rows, chunk_rows, filter_rules,
+                                                             tracer.aers if tracer else ())
+                total_ls_rows = chunked.total_rows
+                recorder.rows_out(total_ls_rows)
+                log.info(f"Streamed {total_ls_rows} rows in {chunked.blocks} blocks of up to {chunk_rows} rows from '{ls_sheet_name}'; kept {len(df_ls_raw)} rows passing the filter rules.")
+            else:
+                df_ls_raw, reader_engine = load_lifesphere_frame(lifesphere_file, ls_sheet_name, engine, ls_header_rows)
+                total_ls_rows = len(df_ls_raw)
+                recorder.rows_out(total_ls_rows)
+                log.info(f"Successfully loaded {total_ls_rows} rows ({len(df_ls_raw.columns)} of the needed columns) from '{ls_sheet_name}' using engine '{reader_engine or 'default'}'.")
+        except FileNotFoundError:
+            return False, f"Error: Lifesphere file not found at {lifesphere_file}"
+        except SchemaError as e:
+            return False, str(e)
+        except ValueError as e:
+             if f"Worksheet named '{ls_sheet_name}' not found" in str(e):
+                 return False, f"Error: Worksheet named '{ls_sheet_name}' not found in the Lifesphere file. Please check the sheet name (case-sensitive)."
+             else:
+                return False, f"Error reading Lifesphere sheet '{ls_sheet_name}': {e}. Check file format/corruption."
+        except Exception as e:
+            return False, f"An unexpected error occurred reading Lifesphere file: {e}\n{traceback.format_exc()}"
+
+        # --- Verify Required Columns ---
+        columns_ok, error_msg = check_columns(df_ls_raw.columns, LS_SCHEMA.required, "Lifesphere export", ls_sheet_name)
+        if not columns_ok: return False, error_msg
+
+        # --- Filter Pipeline (Steps 1-5) ---
+        # Every filter builds a boolean mask against the single base frame; the surviving
+        # subset is materialized once in Step 5 instead of copying the frame after each filter.
+        df_base = df_ls_raw # Private (cache) copy of the pruned frame, safe to use without copying
+        del df_ls_raw
+        filter_counts = [("Loaded from Lifesphere export", total_ls_rows)]
+
+        # AER#s were stripped at parse time (missing ones are '')
+        aer_clean = df_base[COL_AER]
+        keep_mask = aer_clean != '' # Remove rows where AER# is missing/empty
+        filter_counts.append((f"Valid {COL_AER}", chunked.valid_rows if chunked else int(keep_mask.sum())))
+        log.info(f"Cleaned {COL_AER}, rows remaining after dropna/empty removal: {filter_counts[-1][1]}")
+        if chunked: traced_rows, traced_pre_rule_mask, traced_keep_mask = chunked.traced_rows()
+        if tracer: tracer.resolve_export(traced_rows[COL_AER] if chunked else aer_clean)
+
+
+        # --- Step 2: Apply Filter Rules (Company Unit, Report Classification, Assigned To, ...) ---
+        report_step(2, rows_in=filter_counts[-1][1])
+        log.debug(f"Filter rules file: '{FILTER_RULES_FILE}'")
+        if not chunked:
+            try:
+                filter_rules = load_filter_rules(FILTER_RULES_FILE)
+            except (ValueError, configparser.Error) as e:
+                return False, f"Error in filter rules file '{FILTER_RULES_FILE}': {e}"
+        missing_rule_cols = [col for col in filter_rules.columns if col not in df_base.columns]
+        if missing_rule_cols:
+            return False, f"Error: Columns used by filter rules are missing in Lifesphere sheet ('{ls_sheet_name}'): {', '.join(missing_rule_cols)}"
+
+        # Fingerprints of the fate-deciding columns, stored with the run for the next delta run (delta mode only)
+        row_fingerprints = None
+        if use_delta:
+            fingerprint_cols = list(dict.fromkeys(filter_rules.columns + [COL_REPORT_CLASS]))
+            row_fingerprints = compute_fingerprints(df_base, aer_clean, fingerprint_cols, rules_salt(filter_rules))
+
+        # Delta mode: unchanged rows keep their previous outcome and skip the rules
+        carried_mask = carried_reviewers = delta_unchanged = None
+        delta_note = ""
+        if use_delta:
+            try:
+                with AssignmentHistory(history_db) as history:
+                    baseline_run = history.previous_run(run_date)
+                    df_prev_fp = history.lookup_fingerprints(baseline_run[0], aer_clean[keep_mask].unique()) if baseline_run else None
+            except sqlite3.Error as e:
+                log.warning(f"Could not read fingerprints from history store: {e}. Processing all rows.")
+                df_prev_fp = None
+            if df_prev_fp is not None and not df_prev_fp.empty:
+                baseline = DeltaBaseline(df_prev_fp, aer_clean)
+                unchanged = keep_mask.to_numpy() & baseline.unchanged(row_fingerprints)
+                carried_mask = pd.Series(unchanged & baseline.passed & pd.notna(baseline.reviewers), index=df_base.index)
+                carried_reviewers = pd.Series(baseline.reviewers, index=df_base.index)
+                unchanged_kept = pd.Series(unchanged & baseline.passed, index=df_base.index)
+                delta_note = (f"Delta mode (baseline run {baseline_run[1]}): {int(unchanged.sum())} unchanged rows reused, "
+                              f"{int(keep_mask.sum() - unchanged.sum())} new/changed rows processed, {int(carried_mask.sum())} carried forward as pending.")
+                log.info(delta_note)
+                delta_unchanged = pd.Series(unchanged, index=df_base.index)
+                keep_mask = keep_mask & ~delta_unchanged # Rules only see new/changed rows
+            else:
+                log.info("Delta mode: no fingerprints from an earlier run, processing all rows.")
+
+        pre_rule_mask = keep_mask
+        if chunked: rule_rejections = chunked.rule_rejections # df_base only holds the rows that passed
+        else: keep_mask, rule_rejections = filter_rules.evaluate(df_base, keep_mask)
+        for rule, rejected in rule_rejections:
+            filter_counts.append((f"Rule '{rule.name}' ({rule.describe()})", filter_counts[-1][1] - rejected))
+            log.info(f"Rule '{rule.name}' ({rule.describe()}): removed {rejected}, rows remaining: {filter_counts[-1][1]}")
+        if carried_mask is not None:
+            keep_mask = keep_mask | unchanged_kept
+            filter_counts.append(("Plus unchanged rows kept in the previous run", int(keep_mask.sum())))
+        passed_mask = keep_mask # Stored with the fingerprints
+        if tracer and chunked: tracer.filter_outcome(traced_rows, filter_rules, traced_pre_rule_mask, traced_keep_mask)
+        elif tracer: tracer.filter_outcome(df_base, filter_rules, pre_rule_mask, keep_mask, delta_unchanged, carried_reviewers)
+        del pre_rule_mask, delta_unchanged
+        recorder.rows_out(filter_counts[-1][1])
+
+
+        # --- Step 3: Clean 'Days Due' ---
+        report_step(3, rows_in=filter_counts[-1][1])
+        if COL_DUE_DAYS in df_base.columns:
+            log.debug("'Days Due' were parsed to numbers at load time.") # See LS_SCHEMA
+        else:
+             log.warning(f"Column '{COL_DUE_DAYS}' not found. Sorting by this column will be skipped.")
+        recorder.rows_out(filter_counts[-1][1])
+
+
+        # --- Step 4: Normalize 'Assigned To' ---
+        report_step(4, rows_in=filter_counts[-1][1])
+        assigned_to = df_base.loc[keep_mask, COL_ASSIGNED_TO].fillna('')
+        recorder.rows_out(len(assigned_to))
+
+
+        # --- Step 5: Prepare master data frame ---
+        report_step(5, rows_in=filter_counts[-1][1])
+        # The single materialization of the filtered subset
+        df_priority_master = df_base.loc[keep_mask]
+        del df_base
+        df_priority_master[COL_ASSIGNED_TO] = assigned_to
+        # Reviewer names are known up front; other names (previous runs) are added as they are assigned
+        df_priority_master[COL_INDIVIDUAL_ASSIGNMENT] = as_category(pd.Series(pd.NA, index=df_priority_master.index), load_reviewers() + list(selected_reviewers))
+        df_priority_master[COL_REMARKS] = pd.NA
+        if carried_mask is not None:
+            # Delta mode: unchanged cases assigned in the previous run stay with the same reviewer
+            carried_rows = carried_mask[keep_mask]
+            df_priority_master[COL_INDIVIDUAL_ASSIGNMENT] = with_categories(df_priority_master[COL_INDIVIDUAL_ASSIGNMENT], carried_reviewers[keep_mask][carried_rows])
+            df_priority_master.loc[carried_rows, COL_INDIVIDUAL_ASSIGNMENT] = carried_reviewers[keep_mask][carried_rows]
+            df_priority_master.loc[carried_rows, COL_REMARKS] = 'Pending from prev. allocation'
+            log.info(f"Carried forward {int(carried_rows.sum())} unchanged cases as pending.")
+        filtered_case_count = len(df_priority_master)
+        recorder.rows_out(filtered_case_count)
+        fingerprint_records = None
+        if row_fingerprints is not None: # Kept as arrays; the (aer, fingerprint, passed) tuples are only made while inserting
+            valid_rows = (aer_clean != '').to_numpy()
+            fingerprint_records = zip(aer_clean.to_numpy()[valid_rows], row_fingerprints[valid_rows], passed_mask.to_numpy()[valid_rows])
+        del aer_clean, assigned_to, keep_mask, passed_mask, row_fingerprints
+        log.debug(f"Initial 'df_priority_master' created with {filtered_case_count} rows.")
+        filter_peak_mb = peak_rss_mb()
+        log.debug(f"Filter pipeline row counts: {filter_counts}; peak memory so far: {format_mb(filter_peak_mb)}")
+
+
+        # --- Step 6: Load and Combine Previous Assignments (Enhanced Debugging) ---
+        report_step(6)
+        df_pending_caselist = pd.DataFrame() # Combined list
+        df_prev_priority_raw = pd.DataFrame() # Raw prev priority for step 9
+        traced_prev_aers, previous_source = set(), "no previous assignments"
+
+        if prev_assign_file and os.path.exists(prev_assign_file):
+            log.info(f"Processing previous assignment file: {os.path.basename(prev_assign_file)}")
+            previous_source = os.path.basename(prev_assign_file)
+            # Both sheets come from one opened workbook (or from the background read started in Step 1)
+            df_prev_priority, df_prev_pending = load_previous_sheets(prev_assign_file, [prev_prio_sheet_name, prev_pend_sheet_name], previous_read)
+            if isinstance(df_prev_priority, Exception):
+                log.error(f"Could not read '{prev_prio_sheet_name}': {df_prev_priority}")
+                df_prev_priority = pd.DataFrame()
+            else:
+                df_prev_priority_raw = df_prev_priority # Private copy from the cache, not modified below
+                log.info(f"Read {len(df_prev_priority)} rows from '{prev_prio_sheet_name}'.")
+
+            if isinstance(df_prev_pending, Exception):
+                log.error(f"Could not read '{prev_pend_sheet_name}': {df_prev_pending}")
+                df_prev_pending = pd.DataFrame()
+            else:
+                log.info(f"Read {len(df_prev_pending)} rows from '{prev_pend_sheet_name}'.")
+
+            # Process and Combine
+            processed_dfs = []
+
+            def process_prev_df(df, sheet_name):
+                # Process previous dataframes rigorously
+                if df is None or df.empty:
+                    log.debug(f"Skipping processing for empty DataFrame ({sheet_name}).")
+                    return pd.DataFrame()
+                log.debug(f"Processing DataFrame from '{sheet_name}'...")
+                missing = PREV_SCHEMA.missing(df.columns) # Need assignment to eventually populate if pending
+                if missing:
+                    log.warning(f"Missing columns in '{sheet_name}': {', '.join(missing)}. Skipping.")
+                    return pd.DataFrame()
+
+                # AER# and assignment were cleaned at parse time (PREV_SCHEMA); an empty AER# cannot be matched
+                df_proc = df.loc[df[COL_AER] != '', REQUIRED_PREV_COLS]
+
+                if not df_proc.empty:
+                    log.debug(f"Valid rows after cleaning AER# from '{sheet_name}': {len(df_proc)}")
+                    if tracer: traced_prev_aers.update(tracer.previous_sheet(df_proc, sheet_name, COL_AER, COL_INDIVIDUAL_ASSIGNMENT))
+                    return df_proc
+                else:
+                    log.info(f"No valid rows remaining after cleaning AER# from '{sheet_name}'.")
+                    return pd.DataFrame()
+
+            df_prio_processed = process_prev_df(df_prev_priority, prev_prio_sheet_name)
+            df_pend_processed = process_prev_df(df_prev_pending, prev_pend_sheet_name)
+
+            # Combine (Priority cases added first)
+            if not df_prio_processed.empty: processed_dfs.append(df_prio_processed)
+            if not df_pend_processed.empty: processed_dfs.append(df_pend_processed)
+
+            if processed_dfs:
+                df_pending_caselist = pd.concat(processed_dfs, ignore_index=True)
+                log.debug(f"Combined previous assignments before deduplication: {len(df_pending_caselist)} rows.")
+                # Keep the first entry for any duplicate AER# (Priority takes precedence)
+                df_pending_caselist = df_pending_caselist.drop_duplicates(subset=[COL_AER], keep='first')
+                log.debug(f"Final unique previous assignment list size: {len(df_pending_caselist)} rows.")
+            else:
+                log.info("No valid data found in previous assignment sheets to combine.")
+
+            missing_extra = [col for col in REQUIRED_PREV_PRIO_EXTRA_COLS if col not in df_prev_priority_raw.columns]
+            if missing_extra:
+                 log.warning(f"Column '{', '.join(missing_extra)}' missing in '{prev_prio_sheet_name}'. Balancing (Step 9) may be affected.")
+
+        elif history_db:
+            # No previous workbook: pending cases come from the latest earlier run in the history store
+            log.info(f"Previous assignment file not provided; using history store '{history_db}'.")
+            try:
+                with AssignmentHistory(history_db) as history:
+                    prev_run = history.previous_run(run_date)
+                    if prev_run is None:
+                        log.info("History store has no earlier run.")
+                    else:
+                        prev_run_id, prev_run_date = prev_run
+                        # Only cases not already carried forward (delta mode) need a lookup
+                        aers_to_match = df_priority_master.loc[df_priority_master[COL_INDIVIDUAL_ASSIGNMENT].isna(), COL_AER].unique()
+                        df_hist = history.lookup_assignments(prev_run_id, aers_to_match)
+                        df_pending_caselist = pd.DataFrame({
+                            COL_AER: df_hist['aer'],
+                            COL_INDIVIDUAL_ASSIGNMENT: df_hist['reviewer'].fillna(''),
+                        }).drop_duplicates(subset=[COL_AER], keep='first') # Priority rows come first
+                        df_hist_prio = history.run_assignments(prev_run_id, STATUS_PRIORITY)
+                        df_prev_priority_raw = pd.DataFrame({
+                            COL_AER: df_hist_prio['aer'],
+                            COL_REPORT_CLASS: df_hist_prio['report_class'],
+                            COL_INDIVIDUAL_ASSIGNMENT: df_hist_prio['reviewer'],
+                        })
+                        log.info(f"Run of {prev_run_date}: {len(df_pending_caselist)} of today's cases were already assigned, {len(df_prev_priority_raw)} Priority cases for balancing.")
+                        previous_source = f"history store run of {prev_run_date}"
+                        if tracer: traced_prev_aers.update(tracer.previous_sheet(df_pending_caselist, previous_source, COL_AER, COL_INDIVIDUAL_ASSIGNMENT))
+            except sqlite3.Error as e:
+                log.error(f"Could not read history store '{history_db}': {e}. Continuing without previous assignments.")
+
+        else:
+             log.info("Previous assignment file not provided or not found.")
+
+
+        recorder.rows_out(len(df_pending_caselist))
+        if tracer: tracer.previous_missing(traced_prev_aers, previous_source)
+
+        # --- Step 7 & 8 Combined: Identify previously assigned and mark (Enhanced Debugging) ---
+        report_step(7, rows_in=len(df_priority_master))
+        if not df_pending_caselist.empty:
+            log.debug(f"Master DF rows: {len(df_priority_master)}, Prev List rows: {len(df_pending_caselist)}")
+            # Both sides were cleaned at parse time (LS_SCHEMA / PREV_SCHEMA); history store AER#s are stored clean
+            master_keys, prev_keys = aer_keys(df_priority_master[COL_AER], df_pending_caselist[COL_AER])
+            log.debug(f"Matching on {master_keys.dtype} AER# keys (one hash lookup)...")
+            prev_positions = first_positions(prev_keys, master_keys) # -1: not in the previous assignments
+            matched_mask = prev_positions >= 0
+            # Cases already carried forward in delta mode keep their assignment
+            previously_assigned_mask = matched_mask & df_priority_master[COL_INDIVIDUAL_ASSIGNMENT].isna().to_numpy()
+            num_found_pending = int(previously_assigned_mask.sum())
+            log.info(f"{int(matched_mask.sum())} cases found in the previous assignments, {num_found_pending} of them pending.")
+            recorder.rows_out(num_found_pending)
+            prev_reviewers = df_pending_caselist[COL_INDIVIDUAL_ASSIGNMENT].to_numpy()[np.maximum(prev_positions, 0)] # Valid where matched
+            if tracer: tracer.lookup_outcome(df_priority_master.index, matched_mask, previously_assigned_mask, prev_reviewers)
+
+            # --- UPDATE BASED ON MASK ---
+            report_step(8, rows_in=num_found_pending)
+            if num_found_pending > 0:
+                # Written in place: only the pending rows' assignment and remark change
+                pending_reviewers = prev_reviewers[previously_assigned_mask]
+                df_priority_master[COL_INDIVIDUAL_ASSIGNMENT] = with_categories(df_priority_master[COL_INDIVIDUAL_ASSIGNMENT], pending_reviewers)
+                df_priority_master.loc[previously_assigned_mask, COL_INDIVIDUAL_ASSIGNMENT] = pending_reviewers
+                df_priority_master.loc[previously_assigned_mask, COL_REMARKS] = 'Pending from prev. allocation'
+                log.info(f"Marked {num_found_pending} cases as 'Pending from prev. allocation'.")
+            else:
+                log.info("No pending cases found, no updates applied.")
+            recorder.rows_out(int(df_priority_master[COL_INDIVIDUAL_ASSIGNMENT].isna().sum()))
+
+        else:
+            log.info("No previous assignment data to perform matching.")
+            recorder.rows_out(0)
+
+
+        # --- Filter for cases needing assignment THIS round ---
+        # Use the FINAL updated df_priority_master
+        df_to_assign = df_priority_master[df_priority_master[COL_INDIVIDUAL_ASSIGNMENT].isna()] # Read-only view for Steps 9 & 10
+        log.info(f"Cases remaining for new assignment in this run: {len(df_to_assign)}")
+
+        # --- Assignment Steps 9 & 10 ---
+        if not selected_reviewers: return False, "Error: No reviewers selected for assignment."
+        assignment_settings = load_assignment_settings()
+        scheduler = (scheduler or assignment_settings['scheduler']).strip().lower()
+        capacity = assignment_settings['capacity']
+        if df_to_assign.empty: log.info("No new cases found requiring assignment in this run.")
+        else:
+            log.info(f"Assigning {len(df_to_assign)} new cases to {len(selected_reviewers)} reviewers: {selected_reviewers}")
+            # Step 9: Per-category quotas
+            report_step(9, rows_in=len(df_to_assign))
+            rng = np.random.default_rng()
+            unassigned = df_priority_master[COL_INDIVIDUAL_ASSIGNMENT].isna().to_numpy(copy=True)
+            report_class = df_priority_master[COL_REPORT_CLASS]
+            if scheduler == SCHEDULER_WORKLOAD:
+                # Seed each reviewer's load with the cases they are still carrying from the previous allocation
+                loads = pending_backlog(df_priority_master[COL_INDIVIDUAL_ASSIGNMENT], df_priority_master[COL_REMARKS] == 'Pending from prev. allocation', selected_reviewers)
+                log.info(f"Scheduler: workload (pending backlog: {describe_quotas(loads)}; capacity weights: {describe_quotas(capacity) if capacity else 'all 1.0'})")
+            else: log.info("Scheduler: even split")
+            allocations, allocation_names = [], []
+            for category in ASSIGNMENT_CATEGORIES:
+                in_category = category.mask(report_class).to_numpy() & unassigned
+                positions = np.flatnonzero(in_category)
+                unassigned &= ~in_category # A case belongs to the first matching category only
+                if not len(positions): log.info(f"No new {category.name} cases to assign."); continue
+                log.info(f"Found {len(positions)} {category.name} cases to assign.")
+                if scheduler == SCHEDULER_WORKLOAD:
+                    quotas = workload_quotas(len(positions), selected_reviewers, loads, capacity, rng)
+                else:
+                    prev_counts = {}
+                    if category.balance_with_previous:
+                        prev_counts = previous_category_counts(df_prev_priority_raw, category, selected_reviewers, COL_REPORT_CLASS, COL_INDIVIDUAL_ASSIGNMENT)
+                        if prev_counts: log.debug(f"Previous {category.name} counts for balancing: {prev_counts}")
+                        else: log.debug(f"No previous '{category.name}' cases found assigned to selected reviewers for balancing.")
+                    quotas = balanced_quotas(len(positions), selected_reviewers, prev_counts, rng) if prev_counts else equal_quotas(len(positions), selected_reviewers, rng)
+                log.info(f"{category.name} quotas: {describe_quotas(quotas)}")
+                allocations.append((positions, quotas))
+                allocation_names.append(category.name)
+            if scheduler == SCHEDULER_WORKLOAD: log.info(f"Open cases per reviewer after this run: {describe_quotas(loads)}")
+            recorder.rows_out(sum(sum(quotas.values()) for _, quotas in allocations))
+
+            # Step 10: Apply all categories with one column write
+            report_step(10, rows_in=sum(len(positions) for positions, _ in allocations))
+            if allocations:
+                labels = build_assignment_labels(len(df_priority_master), allocations, rng)
+                assigned = pd.notna(labels)
+                df_priority_master[COL_INDIVIDUAL_ASSIGNMENT] = df_priority_master[COL_INDIVIDUAL_ASSIGNMENT].mask(assigned, labels)
+                log.info(f"Assigned {int(assigned.sum())} cases.")
+                recorder.rows_out(int(assigned.sum()))
+            else: log.info("No cases in any assignment category.")
+            if tracer: tracer.assignment_outcome(df_priority_master, [(name, set(positions)) for name, (positions, _) in zip(allocation_names, allocations)], COL_INDIVIDUAL_ASSIGNMENT, COL_REPORT_CLASS)
+
+
+        # --- Step 11: Prepare Output ---
+        report_step(11, rows_in=len(df_priority_master))
+        today_date_str = run_date.strftime("%d %b %Y")
+        output_filename = assignment_output_path(output_dir, run_date)
+
+        # Define final output DataFrames using the final df_priority_master
+        # (Master data is not held in memory; it is streamed from the Lifesphere file while writing)
+        df_output_priority = df_priority_master[ df_priority_master[COL_INDIVIDUAL_ASSIGNMENT].notna() & df_priority_master[COL_REMARKS].isna() ].copy()
+
+        # Sort Priority Cases
+        if not df_output_priority.empty:
+             log.debug("Sorting Priority Cases output sheet...")
+             sort_columns, sort_ascending = [], []
+             if COL_REPORT_CLASS in df_output_priority.columns: sort_columns.append(COL_REPORT_CLASS); sort_ascending.append(True)
+             if COL_DUE_DAYS in df_output_priority.columns: sort_columns.append(COL_DUE_DAYS); sort_ascending.append(True)
+             if sort_columns:
+                 df_output_priority = df_output_priority.sort_values(by=sort_columns, ascending=sort_ascending, na_position='last')
+                 log.debug(f"Priority Cases sheet sorted by: {sort_columns}.")
+             else: log.debug("Skipping sorting as required columns are missing.")
+        log.info(f"Generated 'Priority Cases' sheet with {len(df_output_priority)} rows.")
+
+        df_output_pending = df_priority_master[ df_priority_master[COL_REMARKS] == 'Pending from prev. allocation' ].copy()
+        log.info(f"Generated 'Pending Cases' sheet with {len(df_output_pending)} rows.")
+        if tracer: tracer.final_outcome(df_priority_master, COL_INDIVIDUAL_ASSIGNMENT, COL_REMARKS, 'Pending from prev. allocation')
+
+
+        # Create Summary String
+        summary = f"Assignment Summary ({today_date_str}):\n"
+        summary += f"- Total cases processed from Lifesphere export ('{ls_sheet_name}'): {total_ls_rows}\n"
+        summary += f"- Cases after filter rules ({', '.join(rule.name for rule in filter_rules.rules)}): {filtered_case_count}\n"
+        summary += f"- Cases identified as pending from previous allocation: {len(df_output_pending)}\n"
+        summary += f"- New cases assigned in this run: {len(df_output_priority)}\n"
+        if delta_note: summary += f"- {delta_note}\n"
+        summary += f"- Scheduler: {scheduler}" + (f" (capacity: {describe_quotas(capacity)})" if capacity and scheduler == SCHEDULER_WORKLOAD else '') + "\n"
+        summary += "\nFilter pipeline (rows remaining after each stage):\n"
+        summary += ''.join(f"  {label}: {count}\n" for label, count in filter_counts)
+        summary += f"Peak memory: {format_mb(peak_rss_mb())} (after filters: {format_mb(filter_peak_mb)})\n"
+
+        # Create Dashboard Tables (one grouped count over Priority + Pending)
+        log.debug("Generating dashboard data...")
+        dashboard = DashboardTables(pd.Series(dtype='int64'), COL_INDIVIDUAL_ASSIGNMENT)
+        try: dashboard = DashboardTables(case_counts(df_output_priority, df_output_pending, COL_REPORT_CLASS, COL_INDIVIDUAL_ASSIGNMENT), COL_INDIVIDUAL_ASSIGNMENT)
+        except Exception as e: log.warning(f"Failed to create dashboard tables: {e}")
+        reviewer_totals = dashboard.reviewer_totals()
+
+        # Dashboard sections: (title, [(caption, table), ...]); the summary text shows the same tables
+        dashboard_sections = []
+        for title, status, count in [("Cases Assigned This Run", ASSIGNED_THIS_RUN, len(df_output_priority)),
+                                     ("Cases Pending From Previous", PENDING_FROM_PREVIOUS, len(df_output_pending))]:
+            tables = [("By Reviewer:", dashboard.by_reviewer(status)), ("By Classification and Reviewer:", dashboard.by_class_and_reviewer(status))]
+            tables = [(caption, table) for caption, table in tables if not table.empty]
+            if not tables: continue
+            summary += f"\n\n--- {title} ({count}) ---\n" + "\n".join(f"{caption}\n{table.to_string()}\n" for caption, table in tables)
+            dashboard_sections.append((f"Summary: {title} ({count})", tables))
+        if not reviewer_totals.empty:
+            title = f"Open Cases by Reviewer ({int(reviewer_totals[TOTAL_COLUMN].sum())})"
+            summary += f"\n\n--- {title} ---\n{reviewer_totals.to_string()}\n"
+            dashboard_sections.append((f"Summary: {title}", [("Assigned This Run + Pending From Previous:", reviewer_totals)]))
+
+        # The Priority/Pending sheets show the full export rows (the processing read only has some columns):
+        # the rows of their cases are kept while the Master data streams past (RowCollector).
+        # With a cache sidecar directory, the header and the Master data rows of an unchanged export come from the cache.
+        workbook_cache = get_workbook_cache()
+        try: export_columns = workbook_cache.get_value(lifesphere_file, ls_sheet_name, variant=('header', ls_header_rows), loader=lambda:
+                                                       read_header(lifesphere_file, ls_sheet_name, ls_header_rows, resolve_engine(engine or load_input_settings()['engine'], lifesphere_file)))
+        except Exception as e:
+            log.warning(f"Could not read the Lifesphere header ({e}); the Priority/Pending sheets show the processing columns only.")
+            export_columns = []
+        export_rows = RowCollector(df_output_priority.index.union(df_output_pending.index))
+
+        # Write to Excel (rows are streamed unless the 'pandas' writer is configured)
+        output_settings = load_output_settings()
+        writer_backend = resolve_writer_backend(output_settings['writer'])
+        columnar = open_columnar_export(output_settings, output_dir, run_date)
+        log.info(f"Writing output file: {output_filename} (writer: {writer_backend}) ...")
+        try:
+            with open_output_writer(output_filename, writer_backend) as writer:
+                 # Data sheets: Master (streamed from source), Priority (sorted), Pending
+                 master_source = export_rows.tee(workbook_cache.iter_rows(lifesphere_file, ls_sheet_name, variant=('master', ls_header_rows),
+                                                                          loader=lambda: iter_sheet_rows(lifesphere_file, ls_sheet_name, skiprows=ls_header_rows)))
+                 if columnar: master_source = columnar.tee_rows(TABLE_MASTER, master_source) # Written as it streams past
+                 master_rows = writer.write_rows(f'{today_date_str}_Master data', master_source)
+                 log.debug(f"Streamed {master_rows} Master data rows.")
+                 df_output_priority = with_export_columns(df_output_priority, export_columns, export_rows)
+                 df_output_pending = with_export_columns(df_output_pending, export_columns, export_rows)
+                 writer.write_frame('Priority Cases', df_output_priority)
+                 writer.write_frame('Pending Cases', df_output_pending)
+                 # Dashboard sheet with bold titles
+                 writer.write_dashboard('Dashboard', dashboard_sections)
+                 log.debug("Dashboard sheet generated.")
+            recorder.rows_out(len(df_output_priority) + len(df_output_pending))
+
+            if columnar:
+                # Fixed column types (see case_assigner.columnar); missing tables are reported, the workbook stands
+                columnar.write_frame(TABLE_PRIORITY, df_output_priority, {COL_DUE_DAYS: 'float64'})
+                columnar.write_frame(TABLE_PENDING, df_output_pending, {COL_DUE_DAYS: 'float64'})
+                columnar.write_frame(TABLE_DASHBOARD, dashboard.count_rows(), {COUNT_COLUMN: 'int64'})
+                log.info(f"Columnar export ({columnar.columnar_format}) written to '{columnar.root_dir}': {columnar.written}")
+                if columnar.errors: summary += f"\nWARNING: Output written, but the columnar export is incomplete: {'; '.join(columnar.errors)}\n"
+
+            if history_db:
+                try:
+                    with AssignmentHistory(history_db) as history:
+                        records = itertools.chain(
+                            frame_records(df_output_priority, STATUS_PRIORITY, COL_AER, COL_INDIVIDUAL_ASSIGNMENT, COL_REPORT_CLASS),
+                            frame_records(df_output_pending, STATUS_PENDING, COL_AER, COL_INDIVIDUAL_ASSIGNMENT, COL_REPORT_CLASS),
+                        )
+                        run_id = history.record_run(run_date, records, source_file=lifesphere_file, output_file=output_filename, fingerprints=fingerprint_records)
+                    log.info(f"Recorded run {run_id} in history store '{history_db}'.")
+                except sqlite3.Error as e:
+                    log.warning(f"Could not record run in history store: {e}")
+                    summary += f"\nWARNING: Output written, but the run could not be recorded in the history store: {e}\n"
+
+            log.info("--- Assignment Process Completed Successfully ---")
+            summary += f"\n\nOutput file saved successfully:\n{output_filename}"
+            if columnar and not columnar.errors: summary += f"\nColumnar export ({columnar.columnar_format}):\n{columnar.root_dir}"
+            return True, summary
+        # ... (Error handling for writing remains the same) ...
+        except PermissionError: error_msg = f"Error writing output Excel file: Permission denied. Is '{os.path.basename(output_filename)}' open? Close it and try again."; log.error(error_msg); return False, error_msg
+        except Exception as e: error_msg = f"Error writing output Excel file: {e}\n{traceback.format_exc()}"; log.error(error_msg); return False, error_msg
+
+    except AssignmentCancelled:
+        log.info("--- Assignment Process Cancelled ---")
+        return False, CANCELLED_MESSAGE
+    except Exception as e:
+        error_msg = f"An unexpected error occurred during processing: {e}\n{traceback.format_exc()}"
+        log.error(f"--- Assignment Process Failed ---\n{error_msg}")
+        return False, error_msg
+    finally: # A run that stopped before Step 6 does not leave its background read behind
+        drop_previous_read(previous_read)
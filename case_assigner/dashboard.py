@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Dashboard tables of the output workbook.
+
+The Priority and Pending cases are counted in one grouped aggregation keyed by
+(status, classification, reviewer). Every dashboard table (cases by reviewer, by
+classification and reviewer, and the reviewer totals over both statuses) is a
+reduction of that single count series, so the output frames are never modified.
+"""
+import numpy as np
+import pandas as pd
+
+ASSIGNED_THIS_RUN = 'Assigned This Run'
+PENDING_FROM_PREVIOUS = 'Pending From Previous'
+CLASS_DISPLAY = 'Report Classification Display'
+COUNT_COLUMN = 'Number of Cases'
+TOTAL_COLUMN = 'Total'
+
+
+def case_counts(df_priority, df_pending, class_col, reviewer_col):
+    """Returns the case count per (status, classification, reviewer); blank classifications count as 'Blank'."""
+    frames = [(ASSIGNED_THIS_RUN, df_priority), (PENDING_FROM_PREVIOUS, df_pending)]
+    keys = pd.DataFrame({
+        'status': np.repeat([status for status, _ in frames], [len(df) for _, df in frames]),
+        CLASS_DISPLAY: pd.concat([df[class_col] for _, df in frames], ignore_index=True).astype(object),
+        reviewer_col: pd.concat([df[reviewer_col] for _, df in frames], ignore_index=True).astype(object),
+    })
+    keys[CLASS_DISPLAY] = keys[CLASS_DISPLAY].fillna('Blank').replace('', 'Blank')
+    return keys.groupby(['status', CLASS_DISPLAY, reviewer_col], sort=True).size()
+
+
+class DashboardTables:
+    """The dashboard tables derived from case_counts()."""
+
+    def __init__(self, counts, reviewer_col):
+        self.counts = counts
+        self.reviewer_col = reviewer_col
+
+    def by_reviewer(self, status):
+        counts = self._status(status)
+        if counts.empty: return pd.DataFrame()
+        return counts.groupby(level=self.reviewer_col).sum().to_frame(COUNT_COLUMN)
+
+    def by_class_and_reviewer(self, status):
+        counts = self._status(status)
+        return pd.DataFrame() if counts.empty else counts.to_frame(COUNT_COLUMN)
+
+    def reviewer_totals(self):
+        """Open cases per reviewer: assigned this run, pending from previous and their total."""
+        if self.counts.empty: return pd.DataFrame()
+        totals = self.counts.groupby(level=['status', self.reviewer_col]).sum().unstack('status', fill_value=0)
+        totals = totals.reindex(columns=[ASSIGNED_THIS_RUN, PENDING_FROM_PREVIOUS], fill_value=0)
+        totals.columns.name = None
+        totals[TOTAL_COLUMN] = totals.sum(axis=1)
+        return totals
+
+    def count_rows(self):
+        """The counts as a flat table: status, classification, reviewer and number of cases per row."""
+        columns = ['status', CLASS_DISPLAY, self.reviewer_col]
+        if self.counts.empty: return pd.DataFrame({col: pd.Series(dtype=object) for col in columns + [COUNT_COLUMN]})
+        return self.counts.rename(COUNT_COLUMN).reset_index()[columns + [COUNT_COLUMN]]
+
+    def _status(self, status):
+        if status not in self.counts.index.get_level_values('status'): return self.counts.iloc[:0]
+        return self.counts.xs(status, level='status')
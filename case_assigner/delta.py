@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental (delta) processing support.
+
+Each delta-mode run fingerprints every export row over the columns that decide its
+fate (AER#, filter rule columns, Report Classification) and stores the fingerprints
+in the history store. Rows whose fingerprint is unchanged since the previous run skip
+the filter rules and keep their previous outcome: rejected again, or carried forward
+as pending with the same reviewer. Runs without delta mode store no fingerprints, so
+the first delta run after them processes all rows.
+Volatile columns such as the due-day count are deliberately not fingerprinted.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+def rules_salt(filter_rules):
+    """Returns a 64-bit salt derived from the rule definitions, so editing the rules invalidates all fingerprints."""
+    text = '|'.join(f"{rule.name}:{rule.describe()}:{rule.case_sensitive}" for rule in filter_rules.rules)
+    return np.uint64(int.from_bytes(hashlib.sha1(text.encode('utf-8')).digest()[:8], 'little'))
+
+
+def compute_fingerprints(df, aer_clean, columns, salt):
+    """
+    Returns an int64 fingerprint per row of `df` (vectorized hash over `columns`,
+    with the cleaned AER# in place of the raw one).
+    """
+    frame = df[[col for col in columns if col in df.columns]].copy()
+    frame['__aer__'] = aer_clean
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy() ^ salt
+    return hashes.view(np.int64) # SQLite stores signed 64-bit integers
+
+
+class DeltaBaseline:
+    """Previous-run fingerprints for today's AER#s, aligned to today's rows."""
+
+    def __init__(self, df_prev, aer_clean):
+        df_prev = df_prev.drop_duplicates(subset=['aer'], keep='first')
+        positions = pd.Index(df_prev['aer']).get_indexer(aer_clean)
+        self.found = positions >= 0
+        safe_positions = np.where(self.found, positions, 0)
+        prev_fingerprints = df_prev['fingerprint'].to_numpy(dtype=np.int64)
+        prev_passed = df_prev['passed'].to_numpy(dtype=bool)
+        prev_reviewers = df_prev['reviewer'].to_numpy(dtype=object)
+        if len(df_prev) == 0: # Nothing to align against
+            prev_fingerprints, prev_passed, prev_reviewers = np.zeros(1, np.int64), np.zeros(1, bool), np.array([None], dtype=object)
+        self.fingerprints = prev_fingerprints[safe_positions]
+        self.passed = prev_passed[safe_positions] & self.found
+        self.reviewers = np.where(self.found, prev_reviewers[safe_positions], None)
+
+    def unchanged(self, fingerprints):
+        """Boolean array: row existed in the previous run with an identical fingerprint."""
+        return self.found & (self.fingerprints == fingerprints)
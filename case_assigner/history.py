@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Embedded (SQLite) store of past assignment runs.
+
+Every successful run appends its Priority and Pending assignments; the next run
+finds its pending cases with an indexed AER# lookup against the latest earlier
+run instead of re-reading yesterday's output workbook. Runs in delta mode also
+store per-AER row fingerprints for the next delta run (see case_assigner.delta).
+"""
+import datetime
+import sqlite3
+
+import pandas as pd
+
+STATUS_PRIORITY = 'Priority'
+STATUS_PENDING = 'Pending'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_date    TEXT NOT NULL,
+    created_at  TEXT NOT NULL,
+    source_file TEXT,
+    output_file TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_run_date ON runs (run_date);
+CREATE TABLE IF NOT EXISTS assignments (
+    run_id      INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    aer         TEXT NOT NULL,
+    reviewer    TEXT,
+    report_class TEXT,
+    status      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assignments_aer ON assignments (aer, run_id);
+CREATE INDEX IF NOT EXISTS idx_assignments_run ON assignments (run_id, status);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    run_id      INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    aer         TEXT NOT NULL,
+    fingerprint INTEGER NOT NULL,
+    passed      INTEGER NOT NULL,
+    PRIMARY KEY (aer, run_id)
+);
+"""
+
+
+class AssignmentHistory:
+    """Connection wrapper around the history database (one instance per run/thread)."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Queries ---
+    def _load_lookup_keys(self, aers):
+        """Fills the temporary key table joined by the lookups; returns the cursor to query with."""
+        cursor = self.conn.cursor()
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS lookup_keys (aer TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM lookup_keys")
+        cursor.executemany("INSERT OR IGNORE INTO lookup_keys (aer) VALUES (?)", ((aer,) for aer in aers))
+        return cursor
+
+    def previous_run(self, before_date):
+        """Returns (run_id, run_date) of the latest run dated before `before_date` (a date), or None."""
+        row = self.conn.execute(
+            "SELECT run_id, run_date FROM runs WHERE run_date < ? ORDER BY run_date DESC, run_id DESC LIMIT 1",
+            (before_date.isoformat(),),
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def lookup_assignments(self, run_id, aers):
+        """
+        Returns the assignments of `run_id` for the given AER#s as a DataFrame
+        [aer, reviewer, report_class, status] (Priority rows before Pending rows).
+        Uses a temporary key table joined through the AER# index, so it scales to large key sets.
+        """
+        cursor = self._load_lookup_keys(aers)
+        rows = cursor.execute(
+            "SELECT a.aer, a.reviewer, a.report_class, a.status FROM lookup_keys k "
+            "JOIN assignments a ON a.aer = k.aer AND a.run_id = ? "
+            "ORDER BY CASE a.status WHEN ? THEN 0 ELSE 1 END",
+            (run_id, STATUS_PRIORITY),
+        ).fetchall()
+        cursor.execute("DELETE FROM lookup_keys")
+        return pd.DataFrame(rows, columns=['aer', 'reviewer', 'report_class', 'status'])
+
+    def lookup_fingerprints(self, run_id, aers):
+        """
+        Returns the fingerprints stored for `run_id` for the given AER#s as a DataFrame
+        [aer, fingerprint, passed, reviewer] (reviewer is None if the case was not assigned in that run).
+        """
+        cursor = self._load_lookup_keys(aers)
+        rows = cursor.execute(
+            "SELECT f.aer, f.fingerprint, f.passed, a.reviewer FROM lookup_keys k "
+            "JOIN fingerprints f ON f.aer = k.aer AND f.run_id = ? "
+            "LEFT JOIN assignments a ON a.aer = f.aer AND a.run_id = f.run_id",
+            (run_id,),
+        ).fetchall()
+        cursor.execute("DELETE FROM lookup_keys")
+        return pd.DataFrame(rows, columns=['aer', 'fingerprint', 'passed', 'reviewer'])
+
+    def run_assignments(self, run_id, status=None):
+        """Returns all assignments of a run (optionally one status) as [aer, reviewer, report_class, status]."""
+        query = "SELECT aer, reviewer, report_class, status FROM assignments WHERE run_id = ?"
+        params = [run_id]
+        if status: query += " AND status = ?"; params.append(status)
+        return pd.DataFrame(self.conn.execute(query, params).fetchall(), columns=['aer', 'reviewer', 'report_class', 'status'])
+
+    # --- Updates ---
+    def record_run(self, run_date, records, source_file=None, output_file=None, fingerprints=None):
+        """
+        Stores one run. `records` is an iterable of (aer, reviewer, report_class, status) tuples,
+        `fingerprints` an optional iterable of (aer, fingerprint, passed) tuples for every export row
+        (delta mode only; it is consumed while inserting, so a generator keeps memory flat).
+        An earlier run with the same run_date is replaced, so same-day reruns do not pile up.
+        Fingerprints are only kept for this run and the run before it.
+        Returns the new run_id.
+        """
+        with self.conn: # One transaction
+            self.conn.execute("DELETE FROM runs WHERE run_date = ?", (run_date.isoformat(),))
+            cursor = self.conn.execute(
+                "INSERT INTO runs (run_date, created_at, source_file, output_file) VALUES (?, ?, ?, ?)",
+                (run_date.isoformat(), datetime.datetime.now().isoformat(timespec='seconds'), source_file, output_file),
+            )
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO assignments (run_id, aer, reviewer, report_class, status) VALUES (?, ?, ?, ?, ?)",
+                ((run_id, aer, reviewer, report_class, status) for aer, reviewer, report_class, status in records),
+            )
+            if fingerprints is not None:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO fingerprints (run_id, aer, fingerprint, passed) VALUES (?, ?, ?, ?)",
+                    ((run_id, aer, int(fingerprint), int(bool(passed))) for aer, fingerprint, passed in fingerprints),
+                )
+            baseline = self.previous_run(run_date)
+            keep_runs = (run_id, baseline[0] if baseline else run_id)
+            self.conn.execute("DELETE FROM fingerprints WHERE run_id NOT IN (?, ?)", keep_runs)
+        return run_id
+
+
+def frame_records(df, status, aer_col, reviewer_col, class_col):
+    """Yields history records from an output frame (missing values stored as NULL)."""
+    if df.empty: return
+    classes = df[class_col] if class_col in df.columns else pd.Series(None, index=df.index)
+    for aer, reviewer, report_class in zip(df[aer_col], df[reviewer_col], classes):
+        yield (
+            str(aer),
+            None if pd.isna(reviewer) else str(reviewer),
+            None if pd.isna(report_class) or str(report_class).strip() == '' else str(report_class),
+            status,
+        )
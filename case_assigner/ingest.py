@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Excel ingestion helpers for the Lifesphere export and previous assignment workbooks.
+
+Processing frames are read column-pruned through a configurable pandas engine (or,
+in chunked mode, streamed in blocks of rows); the untouched master data is streamed
+row by row straight into the output workbook, keeping the full rows of the output cases
+on the way (RowCollector).
+"""
+import importlib.util
+import logging
+import os
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+# --- Engine Selection ---
+ENGINE_AUTO = 'auto'
+# pandas engine name -> module that must be importable for it to work
+ENGINE_MODULES = {
+    'calamine': 'python_calamine',
+    'openpyxl': 'openpyxl',
+    'xlrd': 'xlrd',
+}
+# Engines tried (in order) when the config asks for 'auto'
+ENGINE_PREFERENCE = ['calamine', 'openpyxl']
+# Extensions openpyxl can stream from directly
+OPENPYXL_EXTENSIONS = ('.xlsx', '.xlsm', '.xltx', '.xltm')
+
+
+def engine_available(engine):
+    """Returns True if the pandas Excel engine can be imported in this environment."""
+    module_name = ENGINE_MODULES.get(engine)
+    return module_name is not None and importlib.util.find_spec(module_name) is not None
+
+
+def resolve_engine(requested, path=None):
+    """
+    Returns the Excel engine to pass to pandas for `path`.
+    'auto' (or an empty value) picks the fastest installed engine; a configured
+    engine that is missing falls back to openpyxl with a warning.
+    Returns None to let pandas choose by file extension (e.g. legacy .xls files).
+    """
+    requested = (requested or ENGINE_AUTO).strip().lower()
+    is_openpyxl_file = path is None or os.path.splitext(path)[1].lower() in OPENPYXL_EXTENSIONS
+
+    if requested == ENGINE_AUTO:
+        for engine in ENGINE_PREFERENCE:
+            if engine == 'openpyxl' and not is_openpyxl_file: continue
+            if engine_available(engine): return engine
+        return None
+
+    if engine_available(requested):
+        if requested == 'openpyxl' and not is_openpyxl_file: return None
+        return requested
+
+    log.warning(f"Excel engine '{requested}' is not installed, falling back to the default reader.")
+    return 'openpyxl' if is_openpyxl_file and engine_available('openpyxl') else None
+
+
+# --- Readers ---
+def read_columns(path, sheet_name, columns, skiprows=0, dtype=None, engine=None):
+    """
+    Reads only `columns` from a sheet (pandas never builds the other columns).
+    Columns missing from the sheet are simply absent from the result, so callers
+    can report them with their own validation message.
+    """
+    wanted = set(columns)
+    return pd.read_excel(
+        path, sheet_name=sheet_name, skiprows=skiprows, dtype=dtype, engine=engine,
+        usecols=lambda col: col in wanted,
+    )
+
+
+def read_header(path, sheet_name, skiprows=0, engine=None):
+    """Returns the column names of a sheet; only the rows up to the header are parsed."""
+    return list(pd.read_excel(path, sheet_name=sheet_name, skiprows=skiprows, nrows=0, engine=engine).columns)
+
+
+def iter_sheet_rows(path, sheet_name, skiprows=0):
+    """
+    Yields the rows of a sheet as tuples of cell values, header row first,
+    without materializing the sheet as a DataFrame. Trailing blank rows are dropped.
+    """
+    if os.path.splitext(path)[1].lower() not in OPENPYXL_EXTENSIONS:
+        # Non-xlsx formats cannot be streamed; fall back to a single pandas read
+        df_sheet = pd.read_excel(path, sheet_name=sheet_name, skiprows=skiprows, header=None)
+        for row in df_sheet.itertuples(index=False, name=None):
+            yield tuple(None if pd.isna(value) else value for value in row)
+        return
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        if sheet_name not in workbook.sheetnames:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        pending_blank_rows = 0
+        for row_number, row in enumerate(workbook[sheet_name].iter_rows(values_only=True)):
+            if row_number < skiprows: continue
+            if all(value is None for value in row):
+                pending_blank_rows += 1 # Only emitted if a non-blank row follows
+                continue
+            for _ in range(pending_blank_rows): yield (None,) * len(row)
+            pending_blank_rows = 0
+            yield row
+    finally:
+        workbook.close()
+
+
+class RowCollector:
+    """
+    Passes a row stream (header first, as from iter_sheet_rows) through unchanged and keeps the
+    data rows at `positions` (0 = first row below the header, the row labels of a full read).
+    """
+
+    def __init__(self, positions):
+        self.positions = set(positions)
+        self.rows = {} # position -> row tuple
+
+    def tee(self, rows):
+        for number, row in enumerate(rows):
+            if number - 1 in self.positions: self.rows[number - 1] = row
+            yield row
+
+    def column(self, cell, positions):
+        """Values of cell index `cell` in the kept rows at `positions` (None where absent), converted like pandas does."""
+        values = []
+        for position in positions:
+            row = self.rows.get(position, ())
+            values.append(_cell_value(row[cell]) if cell < len(row) else None)
+        return values
+
+
+def _cell_value(value):
+    """Integral floats as int, like pandas' openpyxl reader (so '12345.0' never becomes an AER#)."""
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+def iter_sheet_blocks(path, sheet_name, columns, skiprows=0, block_rows=50000):
+    """
+    Yields the `columns` of a sheet (the ones present; header row after `skiprows`) as DataFrames
+    of at most `block_rows` rows, streamed with iter_sheet_rows. Rows are labelled by position
+    like a full read (blank rows inside the sheet are kept, as pandas does). At least one block is yielded, empty for a sheet
+    without data rows, so callers can always check the columns found.
+    """
+    rows = iter_sheet_rows(path, sheet_name, skiprows=skiprows)
+    wanted, positions = set(columns), {}
+    for position, name in enumerate(next(rows, None) or ()):
+        if name is not None and str(name) in wanted: positions.setdefault(str(name), position)
+
+    def block_frame(block, start):
+        data = {name: [_cell_value(row[position]) if position < len(row) else None for row in block] for name, position in positions.items()}
+        return pd.DataFrame(data, index=pd.RangeIndex(start, start + len(block)), columns=list(positions), dtype=object)
+
+    start, block = 0, []
+    for row in rows:
+        block.append(row)
+        if len(block) >= block_rows:
+            yield block_frame(block, start)
+            start, block = start + len(block), []
+    if block or start == 0: yield block_frame(block, start)
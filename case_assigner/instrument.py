@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Run instrumentation for perform_assignment.
+
+Each numbered step becomes a timed span with its row counts in/out and the process
+memory at its start and end. The spans are written as a JSON-lines run log next to the
+output workbook (one run_start line, one line per step, one run_end line; runs on the
+same day append to the same file) and rendered as a timing table for the run summary.
+The progress and diagnostics of the run go to the 'case_assigner' loggers; while a run is
+recorded, their records (INFO and up) are added to the run log as 'log' lines, so they are
+kept in the windowed build too, where there is no console. configure_logging() sets up the
+console output for the CLI, watch mode and the GUI.
+"""
+import contextlib
+import datetime
+import json
+import logging
+import os
+import sys
+import time
+
+from case_assigner.memstats import current_rss_mb, peak_rss_mb
+
+log = logging.getLogger(__name__)
+
+RUN_LOG_SUFFIX = '_Assignment.runlog.jsonl'
+TIMING_TABLE_TITLE = "Step timings:"
+LOGGER_NAME = 'case_assigner' # Parent of every module logger of the package
+
+
+def _round(value, digits=1):
+    return None if value is None else round(value, digits)
+
+
+class StepSpan:
+    """Timing and memory of one numbered step."""
+
+    def __init__(self, step, label, rows_in=None):
+        self.step = step
+        self.label = label
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.started_at = datetime.datetime.now().isoformat(timespec='milliseconds')
+        self._start = time.perf_counter()
+        self.seconds = None
+        self.rss_start_mb = current_rss_mb()
+        self.rss_end_mb = None
+        self.peak_rss_mb = None
+
+    def close(self):
+        self.seconds = time.perf_counter() - self._start
+        self.rss_end_mb = current_rss_mb()
+        self.peak_rss_mb = peak_rss_mb()
+
+    @property
+    def rss_delta_mb(self):
+        if self.rss_start_mb is None or self.rss_end_mb is None: return None
+        return self.rss_end_mb - self.rss_start_mb
+
+    def as_record(self):
+        return {
+            'event': 'step', 'step': self.step, 'label': self.label, 'started_at': self.started_at,
+            'seconds': _round(self.seconds, 4), 'rows_in': self.rows_in, 'rows_out': self.rows_out,
+            'rss_start_mb': _round(self.rss_start_mb), 'rss_end_mb': _round(self.rss_end_mb),
+            'rss_delta_mb': _round(self.rss_delta_mb), 'peak_rss_mb': _round(self.peak_rss_mb),
+        }
+
+
+class RunRecorder:
+    """Collects the step spans of one run. Only one span is open at a time."""
+
+    def __init__(self, **run_info):
+        self.run_info = run_info
+        self.started_at = datetime.datetime.now().isoformat(timespec='seconds')
+        self._start = time.perf_counter()
+        self.spans = []
+        self.status = None
+        self.seconds = None
+        self.extra_records = []
+        self.log_records = []
+
+    @property
+    def current(self):
+        return self.spans[-1] if self.spans and self.spans[-1].seconds is None else None
+
+    def start_step(self, step, label, rows_in=None):
+        """Closes the open span (if any) and opens a span for `step`."""
+        self.close_step()
+        self.spans.append(StepSpan(step, label, rows_in))
+        log.info(f"Step {step}: {label}...")
+
+    def rows_out(self, count):
+        """Records the rows the open step hands on to the next one."""
+        if self.current is not None: self.current.rows_out = int(count)
+
+    def close_step(self):
+        if self.current is not None: self.current.close()
+
+    def finish(self, status):
+        """Closes the last span and marks the run as finished with `status` ('success', 'failed', 'cancelled')."""
+        self.close_step()
+        self.status = status
+        self.seconds = time.perf_counter() - self._start
+
+    @contextlib.contextmanager
+    def capture_logs(self):
+        """Adds the package's log records (INFO and up) emitted inside the block to the run log."""
+        handler = _RunLogHandler(self)
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.addHandler(handler)
+        try: yield
+        finally: logger.removeHandler(handler)
+
+    def add_records(self, records):
+        """Adds records (e.g. the AER trace) written to the run log before the run_end line."""
+        self.extra_records.extend(records)
+
+    def timing_table(self):
+        """Returns the per-step timing table shown in the run summary."""
+        lines = [TIMING_TABLE_TITLE, f"  {'Step':<42}{'Seconds':>9}{'Rows in':>10}{'Rows out':>10}{'Mem +/- MB':>11}"]
+        for span in self.spans:
+            if span.seconds is None: continue
+            rows_in = '' if span.rows_in is None else span.rows_in
+            rows_out = '' if span.rows_out is None else span.rows_out
+            delta = '' if span.rss_delta_mb is None else f"{span.rss_delta_mb:+.1f}"
+            lines.append(f"  {f'{span.step}. {span.label}'[:41]:<42}{span.seconds:>9.2f}{rows_in:>10}{rows_out:>10}{delta:>11}")
+        total = self.seconds if self.seconds is not None else time.perf_counter() - self._start
+        lines.append(f"  {'Total':<42}{total:>9.2f}")
+        peak = peak_rss_mb()
+        if peak is not None: lines.append(f"  Peak memory: {peak:,.1f} MB")
+        return '\n'.join(lines)
+
+    def records(self, message=None):
+        """Yields the JSON-lines records of the run."""
+        yield {'event': 'run_start', 'started_at': self.started_at, **self.run_info}
+        for span in self.spans:
+            if span.seconds is not None: yield span.as_record()
+        yield from self.log_records
+        yield from self.extra_records
+        first_line = next(iter((message or '').strip().splitlines()), None)
+        yield {
+            'event': 'run_end', 'status': self.status, 'seconds': _round(self.seconds, 3),
+            'peak_rss_mb': _round(peak_rss_mb()), 'message': first_line,
+        }
+
+    def write_jsonl(self, path, message=None):
+        """Appends the run to the JSON-lines log at `path`. Returns True on success."""
+        try:
+            with open(path, 'a', encoding='utf-8') as log_file:
+                for record in self.records(message): log_file.write(json.dumps(record, default=str) + '\n')
+            return True
+        except OSError as e:
+            log.warning(f"Could not write run log '{path}': {e}")
+            return False
+
+
+class _RunLogHandler(logging.Handler):
+    """Turns log records into 'log' lines of a RunRecorder's run log."""
+
+    def __init__(self, recorder):
+        super().__init__(logging.INFO)
+        self.recorder = recorder
+
+    def emit(self, record):
+        span = self.recorder.current
+        self.recorder.log_records.append({
+            'event': 'log', 'at': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname, 'logger': record.name, 'step': span.step if span else None, 'message': record.getMessage(),
+        })
+
+
+class _ConsoleFormatter(logging.Formatter):
+    """Progress lines as they are; warnings, errors and debug lines with their level in front."""
+
+    def format(self, record):
+        message = super().format(record)
+        return message if record.levelno == logging.INFO else f"{record.levelname}: {message}"
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.setFormatter(_ConsoleFormatter())
+
+
+def configure_logging(verbose=False, console=True):
+    """
+    Sets up the package loggers for an entry point: INFO (DEBUG with `verbose`) to stdout.
+    With `console=False` nothing is printed and the records only reach the run logs (batch worker processes).
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+    logger.propagate = False
+    for handler in [h for h in logger.handlers if isinstance(h, _ConsoleHandler)]: logger.removeHandler(handler)
+    if console and sys.stdout is not None: logger.addHandler(_ConsoleHandler(sys.stdout)) # No stdout in the windowed build
+
+
+def run_log_path(output_dir, run_date):
+    """Returns the JSON-lines run log path for a run date (next to that day's output workbook)."""
+    return os.path.join(output_dir, f"{run_date.strftime('%d %b %Y')}{RUN_LOG_SUFFIX}")
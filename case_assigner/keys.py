@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+Compact AER# keys for matching cases between frames.
+
+AER#s are cleaned strings (see schema.clean_text). When every AER# on both sides is
+a plain decimal integer they are matched as int64, which hashes and compares far
+faster than strings; otherwise (letters, leading zeros, more than 18 digits) both
+sides keep their strings, so a match is always an exact string match.
+"""
+import numpy as np
+import pandas as pd
+
+_INTEGER_AER = r'0|[1-9][0-9]{0,17}' # Round-trips through int64 unchanged
+
+
+def aer_keys(*columns):
+    """Returns one key array per AER# column, all int64 when every value is a plain integer, else all strings."""
+    values = [pd.Series(column, dtype=str) for column in columns]
+    if all(series.str.fullmatch(_INTEGER_AER).all() for series in values):
+        return [series.astype('int64').to_numpy() for series in values]
+    return [series.to_numpy(dtype=object) for series in values]
+
+
+def first_positions(keys, lookup_keys):
+    """Position of each of `lookup_keys` in `keys` (the first one for repeated keys), -1 where absent. One hash lookup."""
+    index = pd.Index(keys)
+    if index.is_unique: return index.get_indexer(lookup_keys)
+    first = ~index.duplicated(keep='first')
+    positions = index[first].get_indexer(lookup_keys)
+    return np.where(positions >= 0, np.flatnonzero(first)[np.maximum(positions, 0)], -1)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Process memory readings (current and peak resident set size) without extra dependencies.
+Every function returns None when the platform does not expose the figure.
+"""
+import os
+import sys
+
+_MB = 1024 * 1024
+
+
+def _windows_memory_counters():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb): return None
+    return counters
+
+
+def current_rss_mb():
+    """Returns the current resident set size of this process in MB."""
+    try:
+        if sys.platform == 'win32':
+            counters = _windows_memory_counters()
+            return counters.WorkingSetSize / _MB if counters else None
+        with open('/proc/self/statm') as statm: # Linux
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / _MB
+    except Exception:
+        return None
+
+
+def peak_rss_mb():
+    """Returns the peak resident set size of this process so far in MB."""
+    try:
+        if sys.platform == 'win32':
+            counters = _windows_memory_counters()
+            return counters.PeakWorkingSetSize / _MB if counters else None
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / _MB if sys.platform == 'darwin' else peak / 1024 # bytes on macOS, KB on Linux
+    except Exception:
+        return None
+
+
+def format_mb(value):
+    """Formats an MB reading for logs/summaries ('n/a' when unavailable)."""
+    return 'n/a' if value is None else f"{value:,.1f} MB"
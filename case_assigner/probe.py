@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Workbook metadata probe for the file previews.
+
+An .xlsx file is a zip of XML parts. The probe reads only what a preview needs:
+the sheet list from xl/workbook.xml, each sheet's <dimension> element (written
+before the cell data, so only the first bytes of the sheet XML are parsed) and,
+for header detection, the first few rows of one sheet plus the shared strings
+they reference. The sheet data itself is never parsed, so probing a 50 MB export
+takes milliseconds. Other formats (.xls) fall back to pandas, which is imported only
+then: the GUI previews files with the standard library alone.
+"""
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+ZIP_EXTENSIONS = ('.xlsx', '.xlsm', '.xltx', '.xltm') # Office Open XML workbooks (ingest.OPENPYXL_EXTENSIONS)
+HEADER_SCAN_ROWS = 20 # Rows searched for the header row
+_CELL_REF = re.compile(r'([A-Z]+)(\d+)')
+
+
+class SheetInfo:
+    """Name and size of one sheet (rows/columns are None when the workbook does not record them)."""
+
+    def __init__(self, name, rows=None, columns=None):
+        self.name = name
+        self.rows = rows
+        self.columns = columns
+
+    def describe(self):
+        if self.rows is None: return self.name
+        return f"{self.name} ({self.rows} rows x {self.columns} columns)"
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _attribute(element, name):
+    """Attribute by local name (workbooks use either the transitional or the strict namespaces)."""
+    for key, value in element.attrib.items():
+        if _local(key) == name: return value
+    return None
+
+
+def _column_number(letters):
+    number = 0
+    for letter in letters: number = number * 26 + ord(letter) - 64
+    return number
+
+
+def _sheet_parts(archive):
+    """Returns [(sheet_name, zip_member), ...] in workbook order."""
+    targets = {}
+    with archive.open('xl/_rels/workbook.xml.rels') as rels:
+        for element in ET.parse(rels).getroot():
+            target = _attribute(element, 'Target') or ''
+            targets[_attribute(element, 'Id')] = target.lstrip('/') if target.startswith('/') else 'xl/' + target
+    sheets = []
+    with archive.open('xl/workbook.xml') as workbook:
+        for element in ET.parse(workbook).getroot().iter():
+            if _local(element.tag) == 'sheet':
+                sheets.append((_attribute(element, 'name'), targets.get(_attribute(element, 'id'))))
+    return sheets
+
+
+def _dimension(archive, member):
+    """(rows, columns) from the sheet's <dimension ref="A1:M100006"/>, or (None, None)."""
+    with archive.open(member) as sheet_xml:
+        for _, element in ET.iterparse(sheet_xml, events=('start',)):
+            tag = _local(element.tag)
+            if tag == 'dimension':
+                refs = [_CELL_REF.fullmatch(ref) for ref in (_attribute(element, 'ref') or '').split(':')]
+                if not all(refs): return None, None
+                first, last = refs[0], refs[-1]
+                return int(last.group(2)) - int(first.group(2)) + 1, _column_number(last.group(1)) - _column_number(first.group(1)) + 1
+            if tag == 'sheetData': break # The dimension, if any, comes before the cell data
+    return None, None
+
+
+def probe_workbook(path):
+    """Returns a SheetInfo per sheet of the workbook at `path`, in workbook order."""
+    if os.path.splitext(path)[1].lower() not in ZIP_EXTENSIONS:
+        import pandas as pd
+        with pd.ExcelFile(path) as workbook: return [SheetInfo(name) for name in workbook.sheet_names]
+    with zipfile.ZipFile(path) as archive:
+        return [SheetInfo(name, *(_dimension(archive, member) if member in archive.namelist() else (None, None)))
+                for name, member in _sheet_parts(archive)]
+
+
+def _shared_strings(archive, needed):
+    """Returns {index: text} for the shared string indexes in `needed`, parsing only up to the largest one."""
+    found = {}
+    if not needed or 'xl/sharedStrings.xml' not in archive.namelist(): return found
+    last = max(needed)
+    with archive.open('xl/sharedStrings.xml') as strings_xml:
+        index = 0
+        for _, element in ET.iterparse(strings_xml, events=('end',)):
+            if _local(element.tag) != 'si': continue
+            if index in needed: found[index] = ''.join(node.text or '' for node in element.iter() if _local(node.tag) == 't')
+            if index >= last: break
+            index += 1
+            element.clear()
+    return found
+
+
+def _first_rows(archive, member, max_rows):
+    """Returns [(row_number, [cell, ...]), ...] of the first rows; shared strings are (index,) placeholders."""
+    rows = []
+    with archive.open(member) as sheet_xml:
+        for _, element in ET.iterparse(sheet_xml, events=('end',)):
+            if _local(element.tag) != 'row': continue
+            cells = []
+            for cell in element:
+                if _local(cell.tag) != 'c': continue
+                cell_type = _attribute(cell, 't')
+                if cell_type == 'inlineStr': value = ''.join(node.text or '' for node in cell.iter() if _local(node.tag) == 't')
+                else:
+                    value = next((node.text for node in cell if _local(node.tag) == 'v'), None)
+                    if cell_type == 's' and value is not None: value = (int(value),)
+                cells.append(value)
+            rows.append((int(_attribute(element, 'r') or len(rows) + 1), cells))
+            element.clear()
+            if len(rows) >= max_rows: break
+    return rows
+
+
+def find_header_row(path, sheet_name, marker, max_rows=HEADER_SCAN_ROWS):
+    """
+    Returns the number of rows above the header row (the `skiprows` value), i.e. the
+    0-based index of the first row containing a cell equal to `marker`; None if not found.
+    Raises ValueError if the sheet does not exist.
+    """
+    if os.path.splitext(path)[1].lower() not in ZIP_EXTENSIONS:
+        import pandas as pd
+        df_top = pd.read_excel(path, sheet_name=sheet_name, header=None, nrows=max_rows)
+        matches = [i for i, row in enumerate(df_top.itertuples(index=False, name=None)) if any(str(v).strip() == marker for v in row)]
+        return matches[0] if matches else None
+    with zipfile.ZipFile(path) as archive:
+        member = dict(_sheet_parts(archive)).get(sheet_name)
+        if member is None: raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        rows = _first_rows(archive, member, max_rows)
+        strings = _shared_strings(archive, {cell[0] for _, cells in rows for cell in cells if isinstance(cell, tuple)})
+    for row_number, cells in rows:
+        values = [strings.get(cell[0]) if isinstance(cell, tuple) else cell for cell in cells]
+        if any(value is not None and value.strip() == marker for value in values): return row_number - 1
+    return None
+
+
+def closest_sheet(sheet_name, sheet_names):
+    """Returns the sheet matching `sheet_name` ignoring case/surrounding blanks (or the only sheet), else None."""
+    if sheet_name in sheet_names: return sheet_name
+    wanted = (sheet_name or '').strip().casefold()
+    matches = [name for name in sheet_names if name.strip().casefold() == wanted]
+    if len(matches) == 1: return matches[0]
+    return sheet_names[0] if len(sheet_names) == 1 else None
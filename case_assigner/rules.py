@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Declarative inclusion filters for the Lifesphere export.
+
+Rules are read from an INI file (one section per rule, see filter_rules.ini) and
+compiled into a single evaluation: cheap equality/isin rules run first over all
+rows, substring and regex rules then only look at the rows that are still kept.
+Each rule records how many rows it rejected.
+"""
+import configparser
+import os
+
+import numpy as np
+import pandas as pd
+
+from case_assigner.categories import is_categorical, per_category
+
+# Operator -> relative evaluation cost (lower runs first)
+RULE_OPERATORS = {
+    'equals': 0,
+    'not_equals': 0,
+    'isin': 0,
+    'not_isin': 0,
+    'contains': 1,
+    'not_contains': 1,
+    'regex': 2,
+    'not_regex': 2,
+}
+
+# Built-in rules, used when no rules file exists (the original hard-coded filters)
+DEFAULT_RULES = [
+    {'name': 'Company Unit', 'column': 'Company Unit', 'op': 'contains', 'values': 'BMS',
+     'case_sensitive': 'false', 'allow_blank': 'false'},
+    {'name': 'Report Classification', 'column': 'Report Classification', 'op': 'isin', 'values': 'Literature, Non-AE Case',
+     'case_sensitive': 'true', 'allow_blank': 'true'},
+    {'name': 'Assigned To', 'column': 'Assigned To', 'op': 'not_contains', 'values': '@',
+     'case_sensitive': 'true', 'allow_blank': 'true'},
+]
+
+
+class FilterRule:
+    """A single inclusion rule: rows whose `column` value does not satisfy it are rejected."""
+
+    def __init__(self, name, column, op, values, case_sensitive=True, allow_blank=False):
+        if op not in RULE_OPERATORS:
+            raise ValueError(f"Filter rule '{name}': unknown op '{op}' (use one of: {', '.join(RULE_OPERATORS)})")
+        if not column:
+            raise ValueError(f"Filter rule '{name}': 'column' is required")
+        if not values and op not in ('equals', 'not_equals'):
+            raise ValueError(f"Filter rule '{name}': 'values' is required for op '{op}'")
+        self.name = name
+        self.column = column
+        self.op = op
+        self.values = list(values)
+        self.case_sensitive = case_sensitive
+        self.allow_blank = allow_blank
+        self.cost = RULE_OPERATORS[op]
+
+    def describe(self):
+        blank = ", blank allowed" if self.allow_blank else ""
+        return f"{self.column} {self.op} {self.values}{blank}"
+
+    def passes(self, series):
+        """Returns a boolean numpy array: True where the value satisfies the rule."""
+        if is_categorical(series): return per_category(series, self.passes) # Once per distinct value
+        is_blank = (series.isna() | (series.astype(str).str.strip() == '')).to_numpy()
+        text = series.astype(str)
+        values = self.values
+        if not self.case_sensitive:
+            text = text.str.lower()
+            values = [v.lower() for v in values]
+
+        if self.op in ('equals', 'not_equals', 'isin', 'not_isin'):
+            # Exact comparison against the raw values (case-sensitive matches the original isin filter)
+            matched = (series if self.case_sensitive else text).isin(values).to_numpy()
+        elif self.op in ('contains', 'not_contains'):
+            matched = np.zeros(len(series), dtype=bool)
+            for value in values: matched |= text.str.contains(value, regex=False, na=False).to_numpy()
+        else:
+            pattern = '|'.join(f"(?:{v})" for v in values)
+            matched = text.str.contains(pattern, regex=True, na=False).to_numpy()
+
+        result = ~matched if self.op.startswith('not_') else matched
+        if self.allow_blank: result = result | is_blank
+        elif not self.op.startswith('not_'): result = result & ~is_blank
+        return result
+
+
+class CompiledRules:
+    """Rules sorted by cost, evaluated together into one keep mask."""
+
+    def __init__(self, rules):
+        # sorted() is stable, so rules of equal cost keep their configured order
+        self.rules = sorted(rules, key=lambda rule: rule.cost)
+
+    @property
+    def columns(self):
+        return list(dict.fromkeys(rule.column for rule in self.rules))
+
+    def evaluate(self, df, base_mask=None):
+        """
+        Evaluates all rules over `df`, each rule only on rows not yet rejected.
+        Returns: (keep_mask_series, [(rule, rejected_count), ...]) in evaluation order.
+        """
+        keep = np.ones(len(df), dtype=bool) if base_mask is None else np.asarray(base_mask, dtype=bool).copy()
+        rejections = []
+        for rule in self.rules:
+            alive_positions = np.flatnonzero(keep)
+            if len(alive_positions) == 0:
+                rejections.append((rule, 0)); continue
+            passed = rule.passes(df[rule.column].iloc[alive_positions])
+            keep[alive_positions[~passed]] = False
+            rejections.append((rule, int((~passed).sum())))
+        return pd.Series(keep, index=df.index), rejections
+
+
+def _parse_bool(value, default):
+    if value is None or str(value).strip() == '': return default
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def rule_from_mapping(name, options):
+    """Builds a FilterRule from an INI section / dict of string options."""
+    values = [v.strip() for v in options.get('values', '').split(',') if v.strip()]
+    return FilterRule(
+        name=name,
+        column=options.get('column', '').strip(),
+        op=options.get('op', '').strip().lower(),
+        values=values,
+        case_sensitive=_parse_bool(options.get('case_sensitive'), True),
+        allow_blank=_parse_bool(options.get('allow_blank'), False),
+    )
+
+
+def load_filter_rules(rules_file):
+    """
+    Loads and compiles the rules in `rules_file`; falls back to DEFAULT_RULES when the file does not exist.
+    Raises ValueError for an invalid rule definition.
+    """
+    if not os.path.exists(rules_file):
+        return CompiledRules([rule_from_mapping(r['name'], r) for r in DEFAULT_RULES])
+    config = configparser.ConfigParser(interpolation=None)
+    config.read(rules_file)
+    rules = [rule_from_mapping(section, config[section]) for section in config.sections()]
+    if not rules:
+        raise ValueError(f"No filter rules defined in '{rules_file}'")
+    return CompiledRules(rules)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Column schemas of the input sheets.
+
+A SheetSchema declares each column of a sheet once: whether it is required, the
+dtype it is read with and the converter that normalizes it. Headers are validated
+before the full read (only the rows up to the header are parsed), and `normalize` runs every
+converter as one vectorized pass right after parsing, so the pipeline receives
+frames that are already clean: AER#s stripped with missing values as '', due days
+numeric, low-cardinality columns categorical.
+Converters of low-cardinality columns run once per distinct value.
+"""
+import pandas as pd
+
+from case_assigner.categories import as_category
+
+
+class SchemaError(ValueError):
+    """A sheet does not match its schema (e.g. required columns are missing)."""
+
+
+# --- Converters (Series -> Series, vectorized) ---
+def clean_text(series):
+    """Stripped text with missing values (and the literal 'nan' left by str conversion) as ''."""
+    return series.astype(str).str.strip().replace('nan', '').fillna('')
+
+
+def parse_due_days(series):
+    """'12 day(s)' -> 12.0; anything unparseable -> NaN."""
+    return pd.to_numeric(series.astype(str).str.replace(r'\s*day\(s\)', '', regex=True).str.strip(), errors='coerce')
+
+
+def per_value(converter):
+    """Wraps `converter` to run on the distinct values only and map the result back to every row."""
+    def convert(series):
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        converted = converter(pd.Series(uniques, dtype=series.dtype if len(uniques) else object))
+        return pd.Series(converted.to_numpy()[codes], index=series.index, name=series.name)
+    convert.__name__ = converter.__name__
+    return convert
+
+
+class ColumnSpec:
+    """One column: the dtype it is read with, its converter and categorical storage."""
+
+    def __init__(self, name, dtype=None, converter=None, categories=None):
+        self.name = name
+        self.dtype = dtype
+        self.converter = converter
+        self.categories = categories # Stored as categorical (these categories are always present)
+
+    def describe(self):
+        parts = [self.name]
+        if self.dtype is not None: parts.append(getattr(self.dtype, '__name__', str(self.dtype)))
+        if self.converter is not None: parts.append(self.converter.__name__)
+        if self.categories is not None: parts.append(f"category{sorted(self.categories)}")
+        return ':'.join(parts)
+
+
+class SheetSchema:
+    """The declared columns of one input sheet; `required` lists the columns the sheet is unusable without."""
+
+    def __init__(self, name, columns, required=()):
+        self.name = name
+        self.columns = list(columns)
+        self.required = list(required)
+
+    @property
+    def dtypes(self):
+        """The dtype mapping for pd.read_excel."""
+        return {col.name: col.dtype for col in self.columns if col.dtype is not None}
+
+    @property
+    def key(self):
+        """Identifies the schema in cache keys: a changed converter must not reuse frames normalized by the old one."""
+        return (self.name,) + tuple(col.describe() for col in self.columns) + tuple(self.required)
+
+    @property
+    def categories(self):
+        """{column: categories} of the columns stored as categoricals."""
+        return {col.name: col.categories for col in self.columns if col.categories is not None}
+
+    def missing(self, columns):
+        return [name for name in self.required if name not in columns]
+
+    def normalize(self, df):
+        """Applies the converters and categorical storage to the declared columns present in `df` (in place)."""
+        for col in self.columns:
+            if col.name not in df.columns: continue
+            if col.converter is not None: df[col.name] = col.converter(df[col.name])
+            if col.categories is not None: df[col.name] = as_category(df[col.name], col.categories)
+        return df
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Names and reviewers.ini settings shared by the GUI and the assignment core.
+
+Only the standard library is imported here, so the GUI can build its window from
+this module alone; the assignment core (pandas, numpy, openpyxl) is imported when
+the first run or preview needs it.
+"""
+import logging
+import os
+import configparser
+
+log = logging.getLogger(__name__)
+
+# --- Constants ---
+DEFAULT_REVIEWERS = ["Prabhakar", "Sudhakar", "Anthoni", "Rajalakshmi", "Narasimha", "Janakiram"]
+CONFIG_FILE = 'reviewers.ini'
+CONFIG_SECTION = 'Reviewers'
+CONFIG_INPUT_SECTION = 'Input'
+CONFIG_CACHE_SECTION = 'Cache'
+CONFIG_OUTPUT_SECTION = 'Output'
+CONFIG_HISTORY_SECTION = 'History'
+CONFIG_ASSIGNMENT_SECTION = 'Assignment'
+CONFIG_CAPACITY_SECTION = 'Capacity'
+CONFIG_TRACE_SECTION = 'Trace'
+CONFIG_WATCH_SECTION = 'Watch'
+LS_HEADER_ROWS = 5 # Title rows above the header in the Lifesphere export (used when the AER# header cell is not found)
+
+# Define common column names for consistency and easier changes
+COL_AER = 'AER#'
+COL_REPORT_CLASS = 'Report Classification'
+COL_ASSIGNED_TO = 'Assigned To'
+COL_COMPANY_UNIT = 'Company Unit'
+COL_INDIVIDUAL_ASSIGNMENT = 'Individual Assignment'
+COL_REMARKS = 'Remarks'
+COL_DUE_DAYS = 'No of days due to Case Due Date'
+COL_CASE_SERIOUSNESS = 'Case seriousness'
+COL_REPORT_TYPE = 'Report Type'
+COL_CASE_DUE_DATE = 'Case Due Date'
+
+# --- Progress Reporting ---
+TOTAL_STEPS = 11
+STEP_LABELS = {
+    1: "Loading Lifesphere data",
+    2: "Applying filter rules",
+    3: "Cleaning 'Days Due'",
+    4: "Normalizing 'Assigned To'",
+    5: "Preparing master data frame",
+    6: "Loading previous assignments",
+    7: "Identifying pending cases",
+    8: "Marking pending cases",
+    9: "Computing reviewer quotas",
+    10: "Applying assignments",
+    11: "Writing output file",
+}
+
+class AssignmentCancelled(Exception):
+    """Raised by a progress callback to stop perform_assignment between steps."""
+
+CANCELLED_MESSAGE = "Assignment cancelled by user. No output file was written."
+
+
+def parse_aer_list(text):
+    """Splits a comma/whitespace separated AER# list (blank entries dropped, order kept, duplicates removed)."""
+    return list(dict.fromkeys(part.strip() for part in str(text or '').replace(',', ' ').split() if part.strip()))
+
+
+# --- Configuration Handling Functions ---
+def load_reviewers():
+    """Loads reviewers from the config file."""
+    config = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            config.read(CONFIG_FILE)
+            reviewers_str = config.get(CONFIG_SECTION, 'list', fallback=','.join(DEFAULT_REVIEWERS))
+            return [r.strip() for r in reviewers_str.split(',') if r.strip()]
+        except Exception as e:
+            log.error(f"Could not load config file '{CONFIG_FILE}': {e}")
+            return DEFAULT_REVIEWERS[:]
+    return DEFAULT_REVIEWERS[:]
+
+
+def load_trace_settings():
+    """Loads the AER#s to trace from the config file ([Trace] aers, comma-separated; empty = tracing off)."""
+    config = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            config.read(CONFIG_FILE)
+            return parse_aer_list(config.get(CONFIG_TRACE_SECTION, 'aers', fallback=''))
+        except Exception as e:
+            log.error(f"Could not load trace settings from '{CONFIG_FILE}': {e}")
+    return []
+
+
+def _with_reviewer_list(lines, list_line):
+    """Returns the config file lines with the 'list' line of [Reviewers] replaced (or added); all other lines are kept."""
+    header = None
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith('['):
+            if header is not None: break # End of [Reviewers] without a 'list' line
+            if stripped.strip('[]').strip() == CONFIG_SECTION: header = i
+        elif header is not None and stripped.split('=', 1)[0].split(':', 1)[0].strip().lower() == 'list':
+            value_end = i + 1
+            while value_end < len(lines) and lines[value_end][:1] in (' ', '\t') and lines[value_end].strip(): value_end += 1 # Continuation lines
+            return lines[:i] + [list_line] + lines[value_end:]
+    if header is None: return [f"[{CONFIG_SECTION}]", list_line] + ([''] + lines if lines else []) # No [Reviewers] section yet: add it at the top
+    return lines[:header + 1] + [list_line] + lines[header + 1:]
+
+
+def save_reviewers(reviewer_list):
+    """
+    Saves the current reviewer list to the config file. Only the 'list' line of [Reviewers] is
+    rewritten; the other settings, the comments and the line endings are kept.
+    Returns: (success_boolean, error_message_string)
+    """
+    try:
+        text = ''
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, newline='') as configfile: text = configfile.read()
+        newline = '\r\n' if '\r\n' in text else '\n'
+        lines = _with_reviewer_list(text.splitlines(), f"list = {','.join(reviewer_list)}")
+        with open(CONFIG_FILE, 'w', newline='') as configfile:
+            configfile.write(newline.join(lines) + (newline if text.endswith(('\n', '\r')) or not text else ''))
+        return True, ""
+    except Exception as e:
+        return False, f"Failed to save reviewers list to '{CONFIG_FILE}': {e}"
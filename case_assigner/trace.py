@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in AER# tracing for perform_assignment.
+
+The AER#s to trace come from the CLI (--trace), the GUI or the [Trace] section of
+reviewers.ini. They are resolved to row labels once (one hash lookup against the
+cleaned AER# column) and every later check only looks at those rows. With no AER#s
+configured the tracer is falsy and perform_assignment skips every trace call, so a
+normal run pays nothing. The result is a per-AER lineage: which step, filter rule,
+previous sheet or merge decided each traced case's fate.
+"""
+import numpy as np
+import pandas as pd
+
+from case_assigner.settings import parse_aer_list # Re-exported: the GUI reads it from settings to stay pandas-free
+
+
+class AerTracer:
+    """Lineage of a few AER#s through one run. Falsy when no AER# is traced."""
+
+    def __init__(self, aers=()):
+        self.aers = list(dict.fromkeys(str(aer).strip() for aer in aers if str(aer).strip()))
+        self.lineage = {aer: [] for aer in self.aers}
+        self._labels = {aer: [] for aer in self.aers} # Current row labels per AER# in the frame being processed
+
+    def __bool__(self):
+        return bool(self.aers)
+
+    def add(self, aer, step, text):
+        self.lineage[aer].append((step, text))
+
+    # --- Step hooks (only called when the tracer is truthy) ---
+    def resolve_export(self, aer_clean):
+        """Step 1: finds the traced AER#s in the cleaned AER# column (one index lookup)."""
+        positions = pd.Index(aer_clean.to_numpy()).get_indexer_for(self.aers)
+        found = {}
+        for position in positions[positions >= 0]:
+            found.setdefault(aer_clean.iat[position], []).append(aer_clean.index[position])
+        for aer in self.aers:
+            self._labels[aer] = found.get(aer, [])
+            if not self._labels[aer]: self.add(aer, 1, "not found in the Lifesphere export")
+            elif len(self._labels[aer]) == 1: self.add(aer, 1, "loaded from the Lifesphere export")
+            else: self.add(aer, 1, f"loaded from the Lifesphere export ({len(self._labels[aer])} rows)")
+
+    def filter_outcome(self, df_base, rules, pre_rule_mask, keep_mask, unchanged=None, carried_reviewers=None):
+        """Step 2: explains why each traced row was kept or dropped (delta reuse or the first rejecting rule)."""
+        for aer, labels in self._labels.items():
+            for label in labels:
+                if unchanged is not None and unchanged[label]:
+                    if keep_mask[label]:
+                        reviewer = carried_reviewers[label] if carried_reviewers is not None else None
+                        detail = f", carried forward to {reviewer}" if reviewer is not None and not pd.isna(reviewer) else ""
+                        self.add(aer, 2, f"unchanged since the delta baseline run: kept again{detail}")
+                    else: self.add(aer, 2, "unchanged since the delta baseline run: rejected again")
+                    continue
+                if not pre_rule_mask[label]:
+                    self.add(aer, 2, "dropped before the filter rules")
+                    continue
+                rejecting_rule = next((rule for rule in rules.rules if not np.asarray(rule.passes(df_base.loc[[label], rule.column]))[0]), None)
+                if rejecting_rule is None: self.add(aer, 2, "passed all filter rules")
+                else:
+                    value = df_base.at[label, rejecting_rule.column]
+                    self.add(aer, 2, f"rejected by rule '{rejecting_rule.name}' ({rejecting_rule.describe()}): {rejecting_rule.column} = {value!r}")
+            self._labels[aer] = [label for label in labels if keep_mask[label]] # Only kept rows reach df_priority_master
+
+    def previous_sheet(self, df_prev, sheet_name, aer_col, reviewer_col):
+        """Step 6: notes the traced AER#s listed in a previous assignment sheet (or history store run)."""
+        matches = df_prev.loc[df_prev[aer_col].isin(self.aers), [aer_col, reviewer_col]]
+        listed = set()
+        for aer, reviewer in matches.itertuples(index=False, name=None):
+            listed.add(aer)
+            self.add(aer, 6, f"listed in previous '{sheet_name}' (assigned to {reviewer or 'nobody'})")
+        return listed
+
+    def previous_missing(self, listed_aers, source):
+        for aer in self.aers:
+            if aer not in listed_aers: self.add(aer, 6, f"not in the previous assignments ({source})")
+
+    def lookup_outcome(self, index, matched_mask, pending_mask, prev_reviewers):
+        """Steps 7 & 8: records whether the previous-assignment lookup made each traced row a pending case (arrays aligned with `index`)."""
+        for aer, labels in self._labels.items():
+            for position in index.get_indexer(labels):
+                if not matched_mask[position]: self.add(aer, 7, "no match in the previous assignments: new case")
+                elif pending_mask[position]: self.add(aer, 8, f"matched the previous assignments: pending with {prev_reviewers[position] or 'nobody'}")
+                else: self.add(aer, 8, "matched the previous assignments, but already carried forward (delta mode)")
+
+    def assignment_outcome(self, df, named_allocations, reviewer_col, class_col):
+        """Steps 9 & 10: records the category and reviewer of each traced row assigned in this run."""
+        for aer, labels in self._labels.items():
+            for position, label in zip(df.index.get_indexer(labels), labels):
+                category = next((name for name, positions in named_allocations if position in positions), None)
+                if category is not None: self.add(aer, 10, f"assigned to {df.at[label, reviewer_col]} ({category} quota)")
+                elif pd.isna(df.at[label, reviewer_col]):
+                    self.add(aer, 9, f"in no assignment category ({class_col} = {df.at[label, class_col]!r}): left unassigned")
+
+    def final_outcome(self, df, reviewer_col, remarks_col, pending_remark):
+        """Step 11: records the output sheet each traced row ends up on."""
+        for aer, labels in self._labels.items():
+            for label in labels:
+                reviewer, remarks = df.at[label, reviewer_col], df.at[label, remarks_col]
+                if not pd.isna(remarks) and remarks == pending_remark: self.add(aer, 11, f"written to 'Pending Cases' ({reviewer})")
+                elif not pd.isna(reviewer): self.add(aer, 11, f"written to 'Priority Cases' ({reviewer})")
+                else: self.add(aer, 11, "not written to Priority or Pending Cases")
+
+    def report(self):
+        """Returns the lineage report text."""
+        lines = ["AER trace:"]
+        for aer in self.aers:
+            lines.append(f"  {aer}:")
+            lines.extend(f"    [Step {step}] {text}" for step, text in self.lineage[aer])
+        return '\n'.join(lines)
+
+    def records(self):
+        """Yields one JSON-serializable record per traced AER# for the run log."""
+        for aer in self.aers:
+            yield {'event': 'trace', 'aer': aer, 'lineage': [{'step': step, 'text': text} for step, text in self.lineage[aer]]}
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Watch-folder mode: a long-running process that assigns new exports as they arrive.
+
+The interpreter and pandas/numpy/openpyxl stay loaded between runs, so a new export
+is assigned seconds after it lands in the inbox instead of after a cold start of the
+frozen executable. An export is picked up once its size and modification time have
+not changed for `settle_seconds` (a copy or download still in progress is left
+alone). Each run uses the latest earlier assignment output in the outbox as its
+previous assignment file, writes its output (and run log) to the outbox, and the
+export is then moved to inbox/processed (or inbox/failed), so it is never picked up
+twice, also not after a restart.
+Polling keeps this dependency-free and works on network shares, where file system
+change notifications are unreliable.
+"""
+import datetime
+import os
+import shutil
+import time
+
+from case_assigner import core
+from case_assigner.batch import discover_exports
+from case_assigner.instrument import TIMING_TABLE_TITLE
+
+PROCESSED_DIR = 'processed'
+FAILED_DIR = 'failed'
+
+
+def _log(message):
+    print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}", flush=True)
+
+
+def latest_output(outbox, before):
+    """Returns the newest '<date>_Assignment.xlsx' in `outbox` dated before `before` (a date), or ''."""
+    outputs = []
+    for name in os.listdir(outbox):
+        if not name.endswith('_Assignment.xlsx') or name.startswith('~$'): continue
+        try: run_date = datetime.datetime.strptime(name[:-len('_Assignment.xlsx')], '%d %b %Y').date()
+        except ValueError: continue
+        if run_date < before: outputs.append((run_date, os.path.join(outbox, name)))
+    return max(outputs)[1] if outputs else ''
+
+
+class InboxWatcher:
+    """Polls `inbox` and runs perform_assignment for every export that has settled."""
+
+    def __init__(self, inbox, outbox, reviewers, ls_sheet_name="Adverse Event", prio_sheet_name="Priority Cases",
+                 pend_sheet_name="Pending Cases", initial_previous='', poll_seconds=5.0, settle_seconds=10.0, **options):
+        self.inbox = inbox
+        self.outbox = outbox
+        self.reviewers = list(reviewers)
+        self.sheet_names = (ls_sheet_name, prio_sheet_name, pend_sheet_name)
+        self.initial_previous = initial_previous
+        self.poll_seconds = poll_seconds
+        self.settle_seconds = settle_seconds
+        self.options = options # Passed on to perform_assignment (engine, delta, scheduler, trace_aers)
+        self._seen = {} # path -> ((size, mtime), monotonic time the signature was first seen)
+        self._stuck = set() # Exports that ran but could not be moved out of the inbox (not run again)
+
+    def settled(self, path, now):
+        """True once the file's size and modification time have been unchanged for settle_seconds."""
+        try:
+            stat = os.stat(path)
+        except OSError: # Moved or deleted meanwhile
+            self._seen.pop(path, None)
+            return False
+        signature = (stat.st_size, stat.st_mtime)
+        previous = self._seen.get(path)
+        if previous is None or previous[0] != signature:
+            self._seen[path] = (signature, now)
+            return False
+        return stat.st_size > 0 and now - previous[1] >= self.settle_seconds
+
+    def poll(self):
+        """Checks the inbox once and runs the settled exports in date order. Returns the number of runs."""
+        now = time.monotonic()
+        exports = discover_exports(self.inbox)
+        present = {path for _, path in exports}
+        for path in list(self._seen):
+            if path not in present: del self._seen[path]
+        self._stuck &= present
+        runs = 0
+        for run_date, path in exports:
+            if path in self._stuck or not self.settled(path, now): continue
+            self.run(run_date, path)
+            runs += 1
+        return runs
+
+    def run(self, run_date, path):
+        prev_file = latest_output(self.outbox, run_date) or self.initial_previous
+        _log(f"Assigning {os.path.basename(path)} (run date {run_date.isoformat()}, previous: {os.path.basename(prev_file) if prev_file else 'none'})")
+        start = time.perf_counter()
+        ls_sheet_name, prio_sheet_name, pend_sheet_name = self.sheet_names
+        try:
+            success, message = core.perform_assignment(path, prev_file, ls_sheet_name, prio_sheet_name, pend_sheet_name,
+                                                       self.reviewers, self.outbox, run_date=run_date, **self.options)
+        except Exception as e: # Keep watching whatever happens to one export
+            success, message = False, f"Unexpected error: {e}"
+        _log(f"{'Done' if success else 'FAILED'} in {time.perf_counter() - start:.1f}s: {message.splitlines()[0] if message else ''}")
+        if success: print(message.split(TIMING_TABLE_TITLE)[0].rstrip(), flush=True)
+        else: print(message, flush=True)
+        self._archive(path, PROCESSED_DIR if success else FAILED_DIR)
+
+    def _archive(self, path, subdir):
+        target_dir = os.path.join(self.inbox, subdir)
+        os.makedirs(target_dir, exist_ok=True)
+        target = os.path.join(target_dir, os.path.basename(path))
+        if os.path.exists(target): # Same export name again: keep both
+            stem, ext = os.path.splitext(target)
+            target = f"{stem}_{datetime.datetime.now().strftime('%H%M%S')}{ext}"
+        try: shutil.move(path, target)
+        except OSError as e:
+            _log(f"WARNING: Could not move {os.path.basename(path)} to '{subdir}': {e}. It will not be assigned again while it stays in the inbox.")
+            self._stuck.add(path)
+        self._seen.pop(path, None)
+
+    def serve_forever(self):
+        """Polls until interrupted (Ctrl+C)."""
+        _log(f"Watching '{self.inbox}' every {self.poll_seconds:g}s (exports settle after {self.settle_seconds:g}s); outputs go to '{self.outbox}'. Press Ctrl+C to stop.")
+        try:
+            while True:
+                self.poll()
+                time.sleep(self.poll_seconds)
+        except KeyboardInterrupt:
+            _log("Stopped.")
+        finally:
+            core.shutdown_previous_reads()
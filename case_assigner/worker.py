@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Background execution of perform_assignment for the GUI.
+
+The job runs on a worker thread and reports back through a thread-safe queue
+that the Tk main loop polls, so the window stays responsive during long runs.
+The assignment core (and with it pandas/numpy/openpyxl) is imported on first use or
+by preload_core(), never when the window is built.
+"""
+import importlib
+import logging
+import queue
+import sys
+import threading
+import traceback
+
+from case_assigner.settings import AssignmentCancelled
+
+log = logging.getLogger(__name__)
+
+CORE_MODULE = 'case_assigner.core'
+
+# Event kinds placed on AssignmentWorker.events
+EVENT_PROGRESS = 'progress' # (EVENT_PROGRESS, step_number, step_label)
+EVENT_DONE = 'done'         # (EVENT_DONE, success_boolean, message_string)
+
+
+class AssignmentWorker:
+    """Runs one assignment at a time on a background thread."""
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self._cancel_requested = threading.Event()
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, *args, **kwargs):
+        """
+        Starts perform_assignment(*args, **kwargs) in the background.
+        Returns False (and starts nothing) if a run is already in progress.
+        """
+        if self.is_running(): return False
+        self._cancel_requested.clear()
+        self._thread = threading.Thread(target=self._run, args=args, kwargs=kwargs, name="AssignmentWorker", daemon=True)
+        self._thread.start()
+        return True
+
+    def cancel(self):
+        """Requests cancellation; the run stops before its next step starts."""
+        if self.is_running(): self._cancel_requested.set()
+
+    def poll(self):
+        """Returns all events queued since the last call (never blocks)."""
+        pending = []
+        while True:
+            try: pending.append(self.events.get_nowait())
+            except queue.Empty: return pending
+
+    def _progress(self, step, label):
+        if self._cancel_requested.is_set(): raise AssignmentCancelled()
+        self.events.put((EVENT_PROGRESS, step, label))
+
+    def _run(self, *args, **kwargs):
+        try:
+            from case_assigner.core import perform_assignment # Waits for a preload still in progress
+            success, message = perform_assignment(*args, progress=self._progress, **kwargs)
+        except Exception as e: # perform_assignment handles its own errors; this is a last resort
+            success, message = False, f"Unexpected error in background worker: {e}\n{traceback.format_exc()}"
+        self.events.put((EVENT_DONE, success, message))
+
+
+def _import_core():
+    try: importlib.import_module(CORE_MODULE)
+    except Exception as e: log.warning(f"Could not preload {CORE_MODULE} (it is imported again when a run starts): {e}")
+
+
+def preload_core():
+    """Imports the assignment core on a daemon thread, so the first run or preview does not wait for it."""
+    threading.Thread(target=_import_core, name="CorePreload", daemon=True).start()
+
+
+def shutdown_core():
+    """Stops the background processes of the assignment core, if it was loaded (when the window closes)."""
+    core = sys.modules.get(CORE_MODULE)
+    if core is not None: core.shutdown_previous_reads()
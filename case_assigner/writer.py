@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Output workbook writers.
+
+The streaming backends write each row as it is produced and never build the
+whole workbook as an in-memory cell tree:
+  - 'xlsxwriter' : xlsxwriter in constant_memory mode (optional dependency)
+  - 'openpyxl'   : openpyxl write-only worksheets (always available)
+The 'pandas' backend is the original pd.ExcelWriter(engine='openpyxl') path, kept
+for comparison (see benchmarks/bench_output_writer.py).
+All backends expose write_rows / write_frame / write_dashboard and are used as context managers.
+"""
+import importlib.util
+import logging
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+WRITER_AUTO = 'auto'
+WRITER_BACKENDS = ('xlsxwriter', 'openpyxl', 'pandas')
+FRAME_CHUNK_ROWS = 10000 # Rows converted to Python values at a time
+
+
+def resolve_writer_backend(requested):
+    """Returns the backend to use; 'auto' prefers xlsxwriter, a missing xlsxwriter falls back to openpyxl."""
+    requested = (requested or WRITER_AUTO).strip().lower()
+    has_xlsxwriter = importlib.util.find_spec('xlsxwriter') is not None
+    if requested == WRITER_AUTO: return 'xlsxwriter' if has_xlsxwriter else 'openpyxl'
+    if requested not in WRITER_BACKENDS:
+        log.warning(f"Unknown output writer '{requested}', using the default.")
+        return resolve_writer_backend(WRITER_AUTO)
+    if requested == 'xlsxwriter' and not has_xlsxwriter:
+        log.warning("Output writer 'xlsxwriter' is not installed, falling back to 'openpyxl'.")
+        return 'openpyxl'
+    return requested
+
+
+def frame_value_rows(df):
+    """Yields the header and then the data rows of a DataFrame as tuples of plain Python values (None for missing)."""
+    yield tuple(str(col) for col in df.columns)
+    for start in range(0, len(df), FRAME_CHUNK_ROWS):
+        chunk = df.iloc[start:start + FRAME_CHUNK_ROWS].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def pivot_value_rows(pivot):
+    """
+    Yields a pivot table as rows the way DataFrame.to_excel lays it out: index names + value
+    columns as header, then one row per entry; repeated outer index labels are left blank.
+    """
+    index_names = [str(name) if name is not None else '' for name in pivot.index.names]
+    yield tuple(index_names + [str(col) for col in pivot.columns])
+    previous_labels = None
+    for labels, values in zip(pivot.index, pivot.itertuples(index=False, name=None)):
+        labels = labels if isinstance(labels, tuple) else (labels,)
+        shown = list(labels)
+        if previous_labels is not None:
+            for level in range(len(labels) - 1):
+                if labels[:level + 1] == previous_labels[:level + 1]: shown[level] = None
+                else: break
+        previous_labels = labels
+        yield tuple(shown) + tuple(v.item() if hasattr(v, 'item') else v for v in values)
+
+
+def dashboard_layout(sections):
+    """
+    Flattens dashboard sections [(title, [(caption, pivot_df), ...]), ...] into (row_values, bold)
+    pairs starting in column B, matching the original Dashboard sheet layout.
+    """
+    for title, tables in sections:
+        yield (None, title), True
+        yield (), False
+        for caption, pivot in tables:
+            yield (None, caption), False
+            for row in pivot_value_rows(pivot): yield (None,) + row, False
+            yield (), False
+        yield (), False
+
+
+class _StreamingWriter:
+    """Shared logic of the row-streaming backends; subclasses implement _add_sheet/_append/_close."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None: self._close()
+        return False
+
+    def write_rows(self, sheet_name, rows, header_bold=True):
+        """Streams an iterable of row tuples (header first) into a new sheet. Returns the data row count."""
+        sheet = self._add_sheet(sheet_name)
+        row_count = -1
+        for row_count, row in enumerate(rows):
+            self._append(sheet, row, bold=header_bold and row_count == 0)
+        return max(row_count, 0)
+
+    def write_frame(self, sheet_name, df):
+        """Writes a DataFrame (no index) to a new sheet. Returns the data row count."""
+        return self.write_rows(sheet_name, frame_value_rows(df))
+
+    def write_dashboard(self, sheet_name, sections):
+        """Writes the dashboard sections with bold titles."""
+        sheet = self._add_sheet(sheet_name)
+        for row, bold in dashboard_layout(sections): self._append(sheet, row, bold=bold)
+
+
+class XlsxwriterStreamingWriter(_StreamingWriter):
+    """xlsxwriter in constant_memory mode: each row is flushed to disk once the next row starts."""
+
+    def __init__(self, path):
+        import xlsxwriter
+        self._xlsxwriter = xlsxwriter
+        self.path = path
+        self.book = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            'nan_inf_to_errors': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+            'strings_to_numbers': False,
+            'strings_to_urls': False,
+        })
+        self.bold = self.book.add_format({'bold': True})
+        self._next_row = {}
+
+    def _add_sheet(self, sheet_name):
+        sheet = self.book.add_worksheet(sheet_name)
+        self._next_row[sheet.name] = 0
+        return sheet
+
+    def _append(self, sheet, values, bold=False):
+        row = self._next_row[sheet.name]
+        if values: sheet.write_row(row, 0, values, self.bold if bold else None) # None values become blanks
+        self._next_row[sheet.name] = row + 1
+
+    def _close(self):
+        try:
+            self.book.close()
+        except self._xlsxwriter.exceptions.FileCreateError as e:
+            raise PermissionError(str(e)) from e
+
+
+class OpenpyxlStreamingWriter(_StreamingWriter):
+    """openpyxl write-only workbook: rows are serialized as they are appended."""
+
+    def __init__(self, path):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        self._cell_type = WriteOnlyCell
+        self.path = path
+        self.book = Workbook(write_only=True)
+        self.bold = Font(bold=True)
+
+    def _add_sheet(self, sheet_name):
+        return self.book.create_sheet(sheet_name)
+
+    def _append(self, sheet, values, bold=False):
+        if bold:
+            values = [self._bold_cell(sheet, value) if value is not None else None for value in values]
+        sheet.append(values)
+
+    def _bold_cell(self, sheet, value):
+        cell = self._cell_type(sheet, value=value)
+        cell.font = self.bold
+        return cell
+
+    def _close(self):
+        self.book.save(self.path)
+
+
+class PandasExcelWriter:
+    """The original pd.ExcelWriter(engine='openpyxl') path: builds the full workbook in memory."""
+
+    def __init__(self, path):
+        from openpyxl.styles import Font
+        self.path = path
+        self._writer = pd.ExcelWriter(path, engine='openpyxl')
+        self.bold = Font(bold=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self._writer.close()
+        return False
+
+    def write_rows(self, sheet_name, rows, header_bold=True):
+        sheet = self._writer.book.create_sheet(sheet_name)
+        self._writer.sheets[sheet_name] = sheet
+        row_count = -1
+        for row_count, row in enumerate(rows): sheet.append(row)
+        if header_bold and row_count >= 0:
+            for cell in sheet[1]: cell.font = self.bold
+        return max(row_count, 0)
+
+    def write_frame(self, sheet_name, df):
+        df.to_excel(self._writer, sheet_name=sheet_name, index=False)
+        return len(df)
+
+    def write_dashboard(self, sheet_name, sections):
+        sheet = self._writer.book.create_sheet(sheet_name)
+        self._writer.sheets[sheet_name] = sheet
+        current_row = 1
+        for title, tables in sections:
+            sheet.cell(row=current_row, column=2, value=title).font = self.bold; current_row += 2
+            for caption, pivot in tables:
+                sheet.cell(row=current_row, column=2, value=caption); current_row += 1
+                pivot.to_excel(self._writer, sheet_name=sheet_name, startrow=current_row-1, startcol=1)
+                current_row += pivot.shape[0] + 2
+            current_row += 1
+
+
+def open_output_writer(path, backend):
+    """Returns the writer for a resolved backend name (see resolve_writer_backend)."""
+    if backend == 'xlsxwriter': return XlsxwriterStreamingWriter(path)
+    if backend == 'pandas': return PandasExcelWriter(path)
+    return OpenpyxlStreamingWriter(path)
@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('reviewers.ini', '.')],
+    datas=[('reviewers.ini', '.'), ('filter_rules.ini', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},